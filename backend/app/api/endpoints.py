@@ -1,19 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
+import asyncio
+import json
 import uuid
 import os
+import secrets
 import sys
 from ..core.database import get_db, engine
 from ..models.models import TechnologyDomain, SubTheme, BriefAudit, AustraliaCase, AustraliaMetric, ResearchEntry, InterrogationHistory, EcosystemCompany
-from ..schemas.schemas import DomainRead, SubThemeRead, ScenarioRunResult, PortfolioProfileBase, InterrogationRequest, InterrogationResponse, BriefAuditCreate, BriefAuditRead, AustraliaRegionalResponse, AustraliaCaseBase, ResearchEntryCreate, ResearchEntryRead, ScenarioRequest, InterrogationHistoryRead, EcosystemCompanyRead
+from ..schemas.schemas import DomainRead, SubThemeRead, ScenarioRunResult, PortfolioProfileBase, InterrogationRequest, InterrogationResponse, InterrogationCacheStats, BriefAuditCreate, BriefAuditRead, AustraliaRegionalResponse, AustraliaCaseBase, ResearchEntryCreate, ResearchEntryRead, ScenarioRequest, ScenarioSweepRequest, ScenarioSweepResult, PortfolioScenarioRequest, PortfolioScenarioResult, ScenarioComparisonRequest, ScenarioComparisonResult, PortfolioBatchRequest, PortfolioBatchResult, TRLProgressionResult, RealOptionsRequest, RealOptionsResult, InterrogationHistoryRead, EcosystemCompanyRead
 from .interrogate import synthesize_expert_response
-from ..core.ai_service import augment_scenario_assumptions, generate_research_news
-from ..core.simulation import engine as mc_engine
+from ..core.ai_service import generate_research_news
+from ..core.assumptions_cache import get_scenario_assumptions
+from ..core.executor import executor as sim_executor, SimulationQueueFull
+from ..core.simulation import engine as mc_engine, VARIANCE_REDUCTION_MODES, SWEEP_MAX_CELLS
+from ..core.path_models import build_model
+from ..core.scenario_cache import scenario_cache_key, get_cached_run, store_run
+from ..core.interrogation_cache import invalidate_topic, memory_cache as interrogation_memory_cache
+from ..core.semantic_cache import semantic_index
+from ..core.scenario_atlas import ATLAS_SCENARIO_TYPES, ATLAS_EXPOSURES, atlas_fingerprint, atlas_exposure, get_atlas_entry, get_atlas_result, is_fresh, store_atlas_entry
+from ..core.trl_simulation import trl_engine
+from ..core.real_options import options_engine
+from ..core.cache import LRUCache
 from ..seed import seed_data
 
 router = APIRouter()
 
+# TRL curves keyed by a fingerprint of the domains' (topic_id, trl, years_to_scale)
+trl_cache = LRUCache(maxsize=32)
+
 @router.post("/seed")
 async def trigger_seed(drop: bool = False, db: Session = Depends(get_db)):
     """
@@ -126,6 +143,17 @@ async def interrogate_topic(request: InterrogationRequest, db: Session = Depends
 
     return response
 
+@router.get("/interrogate/cache/stats", response_model=InterrogationCacheStats)
+async def get_interrogation_cache_stats():
+    """
+    Semantic cache threshold and hit rate, plus the exact-match layer's in-memory counters.
+    """
+    return InterrogationCacheStats(
+        **semantic_index.stats(),
+        exact_hits=interrogation_memory_cache.hits,
+        exact_misses=interrogation_memory_cache.misses
+    )
+
 @router.get("/interrogate/history", response_model=List[InterrogationHistoryRead])
 async def get_interrogation_history(user_id: str, topic_id: Optional[str] = None, db: Session = Depends(get_db)):
     query = db.query(InterrogationHistory).filter(InterrogationHistory.user_id == user_id)
@@ -133,40 +161,604 @@ async def get_interrogation_history(user_id: str, topic_id: Optional[str] = None
         query = query.filter(InterrogationHistory.topic_id == topic_id)
     return query.order_by(InterrogationHistory.timestamp.desc()).all()
 
-@router.post("/scenario/run", response_model=ScenarioRunResult)
-async def run_scenario(request: ScenarioRequest, db: Session = Depends(get_db)):
+def deeptech_exposure(portfolio: PortfolioProfileBase) -> float:
+    # Simple logic: sum weighted exposure to domains matching this topic
+    return portfolio.asset_allocation.get("DeepTech", 0.1) # Fallback to 10%
+
+def scenario_horizon(augmentation: dict, horizon: Optional[int] = None) -> int:
+    """
+    The requested horizon, else the AI-suggested one clamped to 1-50 years.
+    """
+    return horizon or min(max(int(augmentation.get("horizons", 5)), 1), 50)
+
+async def resolve_scenario_inputs(request: ScenarioRequest, db: Session, refresh_assumptions: bool = False) -> dict:
+    """
+    Resolves the AI assumptions, exposure and horizon shared by the scenario run endpoints.
+    """
     # 1. Fetch domain for context
     domain = db.query(TechnologyDomain).filter(TechnologyDomain.topic_id == request.topic_id).first()
 
     # 2. Get AI Augmented Assumptions (Quantitative Bounds)
-    augmentation = await augment_scenario_assumptions(domain.name if domain else request.topic_id, request.scenario_type)
+    augmentation = await get_scenario_assumptions(db, domain.name if domain else request.topic_id, request.scenario_type, refresh=refresh_assumptions)
 
     # 3. Calculate Portfolio Exposure
-    # Simple logic: sum weighted exposure to domains matching this topic
-    exposure = request.portfolio_data.asset_allocation.get("DeepTech", 0.1) # Fallback to 10%
+    exposure = deeptech_exposure(request.portfolio_data)
 
-    # 4. Execute functional Monte Carlo logic (10,000 paths)
-    mu = augmentation.get("mu", 0.05)
-    sigma = augmentation.get("sigma", 0.2)
+    return {
+        "augmentation": augmentation,
+        "mu": augmentation.get("mu", 0.05),
+        "sigma": augmentation.get("sigma", 0.2),
+        "exposure": exposure,
+        "horizon": scenario_horizon(augmentation, request.horizon)
+    }
 
-    sim_results = mc_engine.run_simulation(
-        base_value=1.0,
-        mu=mu,
-        sigma=sigma,
-        portfolio_exposure=exposure
-    )
+def build_sim_params(request: ScenarioRequest, inputs: dict) -> dict:
+    """
+    Engine keyword arguments for a scenario request; also the content address for the run cache.
+    """
+    return {
+        "base_value": 1.0,
+        "mu": inputs["mu"],
+        "sigma": inputs["sigma"],
+        "portfolio_exposure": inputs["exposure"],
+        "paths": request.paths,
+        "seed": request.seed,
+        "variance_reduction": request.variance_reduction,
+        "tolerance": request.tolerance,
+        "max_paths": request.max_paths,
+        "chunk_size": request.chunk_size,
+        "float32": request.float32,
+        "method": request.method,
+        "steps": inputs["horizon"],
+        "fan_chart": request.fan_chart,
+        "histogram_bins": request.histogram_bins,
+        "cdf_points": request.cdf_points,
+        "thresholds": request.thresholds,
+        "risk_levels": request.risk_levels,
+        "drawdown": request.drawdown,
+        "model": request.model,
+        "model_params": request.model_params
+    }
 
+def scenario_response(inputs: dict, scenario_id: str, sim_results: dict, cache_hit: bool) -> dict:
+    augmentation = inputs["augmentation"]
     return {
-        "scenario_id": augmentation.get("horizons", 5),
+        "scenario_id": scenario_id,
         "impact_bands": sim_results["impact_bands"],
         "risk_deltas": sim_results["risk_deltas"],
         "confidence_intervals": sim_results["confidence_intervals"],
         "assumptions_explicit": {
-            "mu": mu,
-            "sigma": sigma,
-            "exposure": exposure
+            "mu": inputs["mu"],
+            "sigma": inputs["sigma"],
+            "exposure": inputs["exposure"]
         },
-        "augmented_assumptions": augmentation.get("assumptions", [])
+        "augmented_assumptions": augmentation.get("assumptions", []),
+        "mean_impact": sim_results["mean_impact"],
+        "estimator": sim_results["estimator"],
+        "standard_error": sim_results["standard_error"],
+        "paths_used": sim_results["paths_used"],
+        "converged": sim_results.get("converged"),
+        "horizon": inputs["horizon"],
+        "fan_chart": sim_results.get("fan_chart"),
+        "cache_hit": cache_hit,
+        "distribution": sim_results.get("distribution"),
+        "first_passage": sim_results.get("first_passage"),
+        "tail_risk": sim_results.get("tail_risk"),
+        "drawdown": sim_results.get("drawdown"),
+        "sensitivities": sim_results.get("sensitivities"),
+        "model": sim_results.get("model")
+    }
+
+# Request fields that select the scenario rather than how it is simulated
+SCENARIO_SELECTION_FIELDS = {"topic_id", "scenario_type", "portfolio_data", "use_cache"}
+
+def is_default_scenario_request(request: ScenarioRequest) -> bool:
+    """
+    True when every simulation option is left at its default, i.e. the request is one the atlas covers.
+    """
+    return all(
+        getattr(request, name) == field.default
+        for name, field in ScenarioRequest.model_fields.items()
+        if name not in SCENARIO_SELECTION_FIELDS
+    )
+
+@router.post("/scenario/run", response_model=ScenarioRunResult)
+async def run_scenario(request: ScenarioRequest, db: Session = Depends(get_db)):
+    inputs = await resolve_scenario_inputs(request, db)
+    sim_params = build_sim_params(request, inputs)
+    cache_key = scenario_cache_key(sim_params)
+
+    # Default base/bull/bear runs at a standard exposure come straight from the atlas,
+    # provided it was built from the assumptions a live run would use now. The atlas ran
+    # these exact parameters, so the entry shares the live run's id.
+    if request.use_cache and is_default_scenario_request(request):
+        precomputed = get_atlas_result(db, request.topic_id, request.scenario_type, inputs["exposure"], inputs["augmentation"])
+        if precomputed is not None:
+            return {**precomputed, "scenario_id": cache_key, "cache_hit": True, "atlas_hit": True}
+
+    # 4. Execute functional Monte Carlo logic (10,000 paths) off the event loop
+    sim_results = get_cached_run(db, cache_key) if request.use_cache else None
+    cache_hit = sim_results is not None
+
+    if not cache_hit:
+        try:
+            sim_results = await sim_executor.run_simulation(**sim_params)
+        except SimulationQueueFull as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        store_run(db, cache_key, sim_params, sim_results)
+
+    return scenario_response(inputs, cache_key, sim_results, cache_hit)
+
+async def refresh_scenario_atlas(db: Session, force: bool = False) -> dict:
+    """
+    Rebuilds atlas entries whose domain or current AI assumptions changed, or which are
+    older than ATLAS_MAX_AGE (all of them, with freshly called assumptions, with force).
+    Each rebuilt (domain, scenario type) costs one simulation per standard exposure, run
+    exactly as a default live request would.
+    """
+    domains = db.query(TechnologyDomain).all()
+    built, fresh, failed = 0, 0, 0
+
+    for domain in domains:
+        for scenario_type in ATLAS_SCENARIO_TYPES:
+            request = ScenarioRequest(
+                topic_id=domain.topic_id,
+                scenario_type=scenario_type,
+                portfolio_data=PortfolioProfileBase(
+                    asset_allocation={}, public_private_split={}, infra_exposure=0.0, risk_tolerance="moderate"
+                )
+            )
+            inputs = await resolve_scenario_inputs(request, db, refresh_assumptions=force)
+            if "error" in inputs["augmentation"]:
+                # Fallback assumptions are not cached, so an entry built on them would never be served
+                print(f"Atlas refresh skipped {domain.topic_id}/{scenario_type}: {inputs['augmentation']['error']}")
+                failed += 1
+                continue
+
+            fingerprint = atlas_fingerprint(domain, inputs["augmentation"])
+            if not force and is_fresh(get_atlas_entry(db, domain.topic_id, scenario_type), fingerprint):
+                fresh += 1
+                continue
+
+            try:
+                results = {}
+                for exposure in ATLAS_EXPOSURES:
+                    exposure_inputs = {**inputs, "exposure": exposure}
+                    sim_params = build_sim_params(request, exposure_inputs)
+                    cache_key = scenario_cache_key(sim_params)
+                    sim_results = await sim_executor.run_simulation(**sim_params)
+                    store_run(db, cache_key, sim_params, sim_results)
+                    results[atlas_exposure(exposure)] = scenario_response(exposure_inputs, cache_key, sim_results, cache_hit=False)
+            except Exception as e:
+                print(f"Atlas refresh failed for {domain.topic_id}/{scenario_type}: {e}")
+                failed += 1
+                continue
+
+            store_atlas_entry(db, domain.topic_id, scenario_type, fingerprint, results)
+            built += 1
+
+    print(f"Scenario atlas refreshed: {built} built, {fresh} fresh, {failed} failed")
+    return {"domains": len(domains), "built": built, "fresh": fresh, "failed": failed}
+
+def require_cron_secret(authorization: Optional[str] = Header(None)):
+    """
+    Vercel cron jobs send "Authorization: Bearer $CRON_SECRET". Once CRON_SECRET is set the
+    header is required; on Vercel without it the route is closed rather than left public.
+    """
+    secret = os.getenv("CRON_SECRET")
+    if not secret:
+        if os.getenv("VERCEL") == "1":
+            raise HTTPException(status_code=503, detail="CRON_SECRET environment variable is not configured on Vercel.")
+        return
+    if not secrets.compare_digest(authorization or "", f"Bearer {secret}"):
+        raise HTTPException(status_code=401, detail="Invalid cron credentials")
+
+@router.api_route("/scenario/atlas/refresh", methods=["GET", "POST"], dependencies=[Depends(require_cron_secret)])
+async def trigger_atlas_refresh(force: bool = False, db: Session = Depends(get_db)):
+    """
+    Rebuilds stale atlas entries; serverless deployments call this from the cron in
+    vercel.json (a GET) instead of the background loop.
+    """
+    return await refresh_scenario_atlas(db, force=force)
+
+@router.post("/scenario/assumptions/refresh")
+async def refresh_assumptions(topic_id: str, scenario_type: str, db: Session = Depends(get_db)):
+    """
+    Replaces the cached AI assumptions for one (topic, scenario type) with a fresh model call.
+    Atlas entries built from the old assumptions stop being served until the next refresh
+    rebuilds them; new runs are keyed by the new mu/sigma.
+    """
+    domain = db.query(TechnologyDomain).filter(TechnologyDomain.topic_id == topic_id).first()
+    augmentation = await get_scenario_assumptions(db, domain.name if domain else topic_id, scenario_type, refresh=True)
+    if "error" in augmentation:
+        raise HTTPException(status_code=502, detail=f"Assumptions refresh failed: {augmentation['error']}")
+    return {"topic_id": topic_id, "scenario_type": scenario_type, **augmentation}
+
+@router.post("/scenario/options", response_model=RealOptionsResult)
+async def value_real_options(request: RealOptionsRequest, db: Session = Depends(get_db)):
+    """
+    Values the option to commit capital to each domain over its years_to_scale window,
+    using the scenario's mu/sigma and TRL-based technical risk, on one batched lattice.
+    """
+    query = db.query(TechnologyDomain)
+    if request.topic_ids:
+        query = query.filter(TechnologyDomain.topic_id.in_(request.topic_ids))
+    domains = query.order_by(TechnologyDomain.topic_id).all()
+    if not domains:
+        raise HTTPException(status_code=404, detail="No matching domains")
+
+    augmentations = await asyncio.gather(*[
+        get_scenario_assumptions(db, d.name, request.scenario_type) for d in domains
+    ])
+    trls = [d.trl or 1 for d in domains]
+    years = [d.years_to_scale or 1 for d in domains]
+    mus = [a.get("mu", 0.05) for a in augmentations]
+    sigmas = [a.get("sigma", 0.2) for a in augmentations]
+
+    try:
+        result = await sim_executor.call_function(
+            options_engine.value, trls, years, mus, sigmas,
+            investment_cost=request.investment_cost, steps=request.steps,
+            risk_free_rate=request.risk_free_rate, hurdle_rate=request.hurdle_rate, american=request.american
+        )
+    except SimulationQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    return {
+        "scenario_type": request.scenario_type,
+        "steps": result["steps"],
+        "risk_free_rate": result["risk_free_rate"],
+        "hurdle_rate": result["hurdle_rate"],
+        "investment_cost": result["investment_cost"],
+        "static_npv": result["static_npv"],
+        "valuations": [
+            {
+                "topic_id": d.topic_id,
+                "name": d.name,
+                "trl": trl,
+                "years_to_scale": year,
+                "mu": mu,
+                "sigma": sigma,
+                "failure_hazard": hazard,
+                "opportunity_cost": delta,
+                "option_value": value,
+                "european_value": european,
+                "flexibility_value": flexibility,
+                "invest_now": invest_now,
+                "exercise_boundary": boundary
+            }
+            for d, trl, year, mu, sigma, hazard, delta, value, european, flexibility, invest_now, boundary in zip(
+                domains, trls, years, mus, sigmas, result["failure_hazards"], result["opportunity_costs"], result["option_values"],
+                result["european_values"], result["flexibility_values"], result["invest_now"],
+                result["exercise_boundary"]
+            )
+        ]
+    }
+
+@router.post("/scenario/run/stream")
+async def stream_scenario(request: ScenarioRequest, http_request: Request, db: Session = Depends(get_db)):
+    """
+    Server-Sent Events variant of /scenario/run. Emits a 'progress' event with the current
+    bands, path count and standard error after each (doubling) batch and a final 'done'
+    event. Stops early once a tolerance is met, and frees the worker if the client
+    disconnects.
+    """
+    if request.method != "monte_carlo":
+        raise HTTPException(status_code=400, detail="Streaming is only available for Monte Carlo runs")
+    if request.variance_reduction not in VARIANCE_REDUCTION_MODES:
+        raise HTTPException(status_code=400, detail=f"Unknown variance reduction mode: {request.variance_reduction}")
+    try:
+        build_model(request.model, request.model_params)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    inputs = await resolve_scenario_inputs(request, db)
+    mu, sigma, exposure, horizon = inputs["mu"], inputs["sigma"], inputs["exposure"], inputs["horizon"]
+
+    try:
+        batches = sim_executor.stream_simulation(
+            base_value=1.0,
+            mu=mu,
+            sigma=sigma,
+            portfolio_exposure=exposure,
+            max_paths=request.paths or request.max_paths or mc_engine.paths,
+            seed=request.seed,
+            variance_reduction=request.variance_reduction,
+            steps=horizon,
+            model=request.model,
+            model_params=request.model_params
+        )
+    except SimulationQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    def event(name: str, data: dict) -> str:
+        return f"event: {name}\ndata: {json.dumps(data)}\n\n"
+
+    async def event_source():
+        previous = None
+        converged = False
+        paths_used = 0
+        try:
+            async for summary in batches:
+                if await http_request.is_disconnected():
+                    return
+                current = summary["impact_bands"] + summary["confidence_intervals"] + [summary["mean_impact"]]
+                if request.tolerance is not None and previous is not None:
+                    converged = max(abs(a - b) for a, b in zip(current, previous)) <= request.tolerance
+                previous = current
+                paths_used = summary["paths_used"]
+
+                yield event("progress", {
+                    "paths_used": summary["paths_used"],
+                    "impact_bands": summary["impact_bands"],
+                    "confidence_intervals": summary["confidence_intervals"],
+                    "mean_impact": summary["mean_impact"],
+                    "standard_error": summary["standard_error"],
+                    "estimator": summary["estimator"]
+                })
+                if converged:
+                    break
+
+            yield event("done", {
+                "paths_used": paths_used,
+                "converged": converged,
+                "horizon": horizon,
+                "assumptions_explicit": {"mu": mu, "sigma": sigma, "exposure": exposure},
+                "augmented_assumptions": inputs["augmentation"].get("assumptions", [])
+            })
+        finally:
+            await batches.aclose()
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/scenario/sweep", response_model=ScenarioSweepResult)
+async def run_scenario_sweep(request: ScenarioSweepRequest):
+    """
+    Evaluates a (mu, sigma, exposure) grid against one shared set of draws for heat maps.
+    """
+    if request.percentiles and any(p < 0 or p > 100 for p in request.percentiles):
+        raise HTTPException(status_code=400, detail="Percentiles must be between 0 and 100")
+
+    cells = len(request.mus) * len(request.sigmas) * len(request.exposures)
+    if cells > SWEEP_MAX_CELLS:
+        raise HTTPException(status_code=400, detail=f"Sweep grid has {cells} cells; at most {SWEEP_MAX_CELLS} are allowed")
+
+    try:
+        sweep = await sim_executor.call(
+            "run_sweep",
+            request.mus,
+            request.sigmas,
+            request.exposures,
+            paths=request.paths,
+            seed=request.seed,
+            percentiles=request.percentiles
+        )
+    except SimulationQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    return {
+        "mus": request.mus,
+        "sigmas": request.sigmas,
+        "exposures": request.exposures,
+        **sweep
+    }
+
+@router.post("/scenario/portfolio", response_model=PortfolioScenarioResult)
+async def run_portfolio_scenario(request: PortfolioScenarioRequest, db: Session = Depends(get_db)):
+    """
+    Simulates the whole asset allocation as correlated domains and returns portfolio-level
+    bands plus each domain's contribution.
+    """
+    allocation = request.portfolio_data.asset_allocation
+    if not allocation:
+        raise HTTPException(status_code=400, detail="asset_allocation is empty")
+
+    keys = list(allocation.keys())
+    domains = db.query(TechnologyDomain).filter(
+        (TechnologyDomain.topic_id.in_(keys)) | (TechnologyDomain.name.in_(keys))
+    ).all()
+    by_key = {d.topic_id: d for d in domains}
+    by_key.update({d.name: d for d in domains})
+
+    unknown = [k for k in keys if k not in request.domain_assumptions and k not in by_key]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown domains without explicit assumptions: {', '.join(unknown)}")
+
+    # Resolve missing mu/sigma from the AI assumptions, all domains concurrently
+    pending = [k for k in keys if k not in request.domain_assumptions]
+    augmentations = await asyncio.gather(*[
+        get_scenario_assumptions(db, by_key[k].name, request.scenario_type) for k in pending
+    ])
+    assumptions = {k: (a.mu, a.sigma) for k, a in request.domain_assumptions.items()}
+    assumptions.update({k: (a.get("mu", 0.05), a.get("sigma", 0.2)) for k, a in zip(pending, augmentations)})
+
+    if request.correlation is not None:
+        correlation = request.correlation
+    else:
+        correlation = [[1.0 if i == j else request.default_correlation for j in range(len(keys))] for i in range(len(keys))]
+
+    mus = [assumptions[k][0] for k in keys]
+    sigmas = [assumptions[k][1] for k in keys]
+    weights = [allocation[k] for k in keys]
+    # Domains share one horizon; the portfolio is read once every domain has reached its own
+    horizon = request.horizon or max([scenario_horizon(a) for a in augmentations], default=mc_engine.steps)
+
+    try:
+        sim_results = await sim_executor.call(
+            "run_portfolio", mus, sigmas, weights, correlation,
+            paths=request.paths, seed=request.seed, steps=horizon
+        )
+    except SimulationQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    portfolio = sim_results["portfolio"]
+    return {
+        "impact_bands": portfolio["impact_bands"],
+        "confidence_intervals": portfolio["confidence_intervals"],
+        "mean_impact": portfolio["mean_impact"],
+        "standard_error": portfolio["standard_error"],
+        "risk_deltas": portfolio["risk_deltas"],
+        "paths_used": portfolio["paths_used"],
+        "horizon": horizon,
+        "domains": [
+            {"domain": k, "weight": w, "mu": m, "sigma": sd, **contribution}
+            for k, w, m, sd, contribution in zip(keys, weights, mus, sigmas, sim_results["domains"])
+        ]
+    }
+
+@router.post("/scenario/compare", response_model=ScenarioComparisonResult)
+async def compare_scenarios(request: ScenarioComparisonRequest, db: Session = Depends(get_db)):
+    """
+    Runs several scenario types for one topic against the same shocks and reports paired deltas.
+    """
+    domain = db.query(TechnologyDomain).filter(TechnologyDomain.topic_id == request.topic_id).first()
+    topic_name = domain.name if domain else request.topic_id
+
+    augmentations = await asyncio.gather(*[
+        get_scenario_assumptions(db, topic_name, scenario_type) for scenario_type in request.scenario_types
+    ])
+    mus = [a.get("mu", 0.05) for a in augmentations]
+    sigmas = [a.get("sigma", 0.2) for a in augmentations]
+    horizons = [scenario_horizon(a, request.horizon) for a in augmentations]
+    exposure = deeptech_exposure(request.portfolio_data)
+
+    try:
+        sim_results = await sim_executor.call(
+            "run_comparison", mus, sigmas, exposure,
+            paths=request.paths, seed=request.seed, variance_reduction=request.variance_reduction, steps=horizons
+        )
+    except SimulationQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    baseline = request.scenario_types[0]
+    return {
+        "topic_id": request.topic_id,
+        "exposure": exposure,
+        "paths_used": sim_results["paths_used"],
+        "scenarios": [
+            {
+                "scenario_type": scenario_type,
+                "mu": mu,
+                "sigma": sigma,
+                "horizon": horizon,
+                "impact_bands": result["impact_bands"],
+                "confidence_intervals": result["confidence_intervals"],
+                "mean_impact": result["mean_impact"],
+                "standard_error": result["standard_error"],
+                "augmented_assumptions": augmentation.get("assumptions", [])
+            }
+            for scenario_type, mu, sigma, horizon, result, augmentation in zip(request.scenario_types, mus, sigmas, horizons, sim_results["scenarios"], augmentations)
+        ],
+        "deltas": [
+            {
+                "scenario_type": scenario_type,
+                "baseline": baseline,
+                "impact_bands": delta["impact_bands"],
+                "confidence_intervals": delta["confidence_intervals"],
+                "mean_delta": delta["mean_impact"],
+                "standard_error": delta["standard_error"],
+                "independent_standard_error": delta["independent_standard_error"]
+            }
+            for scenario_type, delta in zip(request.scenario_types[1:], sim_results["deltas"])
+        ]
+    }
+
+@router.post("/scenario/portfolios/batch", response_model=PortfolioBatchResult)
+async def evaluate_portfolio_batch(request: PortfolioBatchRequest, db: Session = Depends(get_db)):
+    """
+    Scores many portfolios against one simulated path set for a (topic, scenario) pair.
+    """
+    domain = db.query(TechnologyDomain).filter(TechnologyDomain.topic_id == request.topic_id).first()
+    augmentation = await get_scenario_assumptions(db, domain.name if domain else request.topic_id, request.scenario_type)
+
+    mu = augmentation.get("mu", 0.05)
+    sigma = augmentation.get("sigma", 0.2)
+    horizon = scenario_horizon(augmentation, request.horizon)
+    exposures = [p.asset_allocation.get(request.allocation_key, 0.1) for p in request.portfolios]
+
+    try:
+        sim_results = await sim_executor.call(
+            "run_exposures", mu, sigma, exposures,
+            paths=request.paths, seed=request.seed, variance_reduction=request.variance_reduction, steps=horizon
+        )
+    except SimulationQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "topic_id": request.topic_id,
+        "scenario_type": request.scenario_type,
+        "assumptions_explicit": {"mu": mu, "sigma": sigma},
+        "paths_used": sim_results["paths_used"],
+        "horizon": horizon,
+        "results": [
+            {
+                "index": i,
+                "exposure": exposure,
+                "impact_bands": result["impact_bands"],
+                "confidence_intervals": result["confidence_intervals"],
+                "mean_impact": result["mean_impact"],
+                "standard_error": result["standard_error"],
+                "risk_deltas": result["risk_deltas"]
+            }
+            for i, (exposure, result) in enumerate(zip(exposures, sim_results["results"]))
+        ]
+    }
+
+@router.get("/trl/progression", response_model=TRLProgressionResult)
+async def get_trl_progression(horizon: int = 15, paths: int = 10000, seed: Optional[int] = None, db: Session = Depends(get_db)):
+    """
+    Probability-of-reaching-TRL-9-by-year curves for every domain from one batched
+    Markov-chain simulation. Cached until any domain's TRL or years_to_scale changes.
+    """
+    if not 1 <= horizon <= 50 or not 100 <= paths <= 1_000_000:
+        raise HTTPException(status_code=400, detail="horizon must be 1-50 and paths 100-1,000,000")
+
+    domains = db.query(TechnologyDomain).order_by(TechnologyDomain.topic_id).all()
+    trls = [d.trl or 1 for d in domains]
+    years = [d.years_to_scale or 1 for d in domains]
+    fingerprint = tuple((d.topic_id, t, y) for d, t, y in zip(domains, trls, years))
+
+    key = (fingerprint, horizon, paths, seed)
+    result = trl_cache.get(key)
+    cache_hit = result is not None
+    if not cache_hit:
+        try:
+            result = await sim_executor.call_function(trl_engine.simulate, trls, years, horizon=horizon, paths=paths, seed=seed)
+        except SimulationQueueFull as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        trl_cache.set(key, result)
+
+    return {
+        "horizon": result["horizon"],
+        "paths": result["paths"],
+        "cache_hit": cache_hit,
+        "domains": [
+            {
+                "topic_id": d.topic_id,
+                "name": d.name,
+                "trl": trl,
+                "years_to_scale": year,
+                "advance_probability": p,
+                "probability_trl9_by_year": curve,
+                "median_years_to_trl9": median
+            }
+            for d, trl, year, p, curve, median in zip(
+                domains, trls, years, result["advance_probabilities"],
+                result["probability_trl9_by_year"], result["median_years_to_trl9"]
+            )
+        ]
     }
 
 # CMS / Research Endpoints
@@ -187,6 +779,7 @@ async def create_research_entry(entry: ResearchEntryCreate, db: Session = Depend
     db.add(db_entry)
     db.commit()
     db.refresh(db_entry)
+    invalidate_topic(db, db_entry.topic_id)
     return db_entry
 
 @router.post("/research/generate/{topic_id}", response_model=ResearchEntryRead)
@@ -210,6 +803,7 @@ async def generate_topic_research(topic_id: str, db: Session = Depends(get_db)):
         db.add(db_entry)
         db.commit()
         db.refresh(db_entry)
+        invalidate_topic(db, topic_id)
         print(f"Successfully generated entry: {db_entry.id}")
         return db_entry
     except Exception as e:
@@ -252,6 +846,8 @@ async def seed_all_research(db: Session = Depends(get_db)):
     if new_entries:
         db.add_all(new_entries)
         db.commit()
+        for topic_id in {e.topic_id for e in new_entries}:
+            invalidate_topic(db, topic_id)
         return {"status": "success", "count": len(new_entries)}
 
     return {"status": "no_updates", "count": 0}
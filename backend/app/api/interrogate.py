@@ -2,14 +2,38 @@ from sqlalchemy.orm import Session
 from ..models.models import TechnologyDomain, ResearchEntry
 from ..schemas.schemas import InterrogationResponse
 from ..core.ai_service import generate_interrogation_response
+from ..core.interrogation_cache import context_hash, interrogation_cache_key, get_cached_response, get_topic_responses, store_response, remaining_ttl, memory_cache
+from ..core.semantic_cache import semantic_index
 import random
 
 async def synthesize_expert_response(db: Session, topic_id: str, query: str) -> InterrogationResponse:
+    # Repeated questions against unchanged context are answered without a model call
+    context = context_hash(db, topic_id)
+    cache_key = interrogation_cache_key(topic_id, query, context)
+    cached = get_cached_response(db, cache_key)
+    if cached is not None:
+        return InterrogationResponse(**cached, cached=True)
+
+    # Then differently worded versions of a question already answered for this topic
+    if not semantic_index.has_topic(topic_id, context):
+        semantic_index.load(topic_id, context, get_topic_responses(db, topic_id, context))
+    match = semantic_index.lookup(topic_id, context, query)
+    if match is not None:
+        cached, similarity, _, answered_at = match
+        # The reworded query expires with the answer it reuses
+        memory_cache.set(cache_key, cached, ttl=remaining_ttl(answered_at))
+        return InterrogationResponse(**cached, cached=True, similarity=similarity)
+
     # Attempt AI augmentation
     ai_result = await generate_interrogation_response(db, topic_id, query)
 
     if "error" not in ai_result:
-        return InterrogationResponse(**ai_result)
+        response = InterrogationResponse(**ai_result)
+        # Only AI answers are cached; the heuristic fallback is cheap and should retry the model
+        payload = response.dict(exclude={"cached", "similarity"})
+        store_response(db, cache_key, topic_id, context, query, payload)
+        semantic_index.add(topic_id, context, query, payload)
+        return response
 
     # Fallback to Heuristic logic if AI fails
     domain = db.query(TechnologyDomain).filter(TechnologyDomain.topic_id == topic_id).first()
@@ -163,6 +163,7 @@ async def augment_scenario_assumptions(topic_name: str, scenario_type: str) -> D
     except Exception as e:
         print(f"Error calling Gemini for assumptions: {e}")
         return {
+            "error": str(e),
             "assumptions": ["Manual verification required due to AI timeout."],
             "mu": 0.05,
             "sigma": 0.20,
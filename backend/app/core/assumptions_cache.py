@@ -0,0 +1,94 @@
+import asyncio
+import datetime
+from typing import Dict, Any, Optional, Tuple
+from sqlalchemy.orm import Session
+from ..models.models import ScenarioAssumptionEntry
+from .database import SessionLocal
+from .ai_service import augment_scenario_assumptions
+
+# Within this age assumptions are served as is
+ASSUMPTIONS_TTL = datetime.timedelta(hours=12)
+# Up to this age stale assumptions are served while a background call refreshes them;
+# beyond it the request waits for a fresh call
+ASSUMPTIONS_MAX_STALE = datetime.timedelta(days=7)
+
+# (topic_name, scenario_type) -> {"assumptions", "timestamp"}
+assumptions_cache: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+# Calls in flight per key, so concurrent misses and refreshes share one model call
+pending: Dict[Tuple[str, str], asyncio.Task] = {}
+
+def assumptions_key(topic_name: str, scenario_type: str) -> Tuple[str, str]:
+    return topic_name, scenario_type.strip().lower()
+
+def get_stored_assumptions(db: Session, key: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+    entry = assumptions_cache.get(key)
+    if entry is not None:
+        return entry
+
+    try:
+        row = db.query(ScenarioAssumptionEntry).filter(
+            ScenarioAssumptionEntry.topic_name == key[0],
+            ScenarioAssumptionEntry.scenario_type == key[1]
+        ).first()
+    except Exception as e:
+        print(f"Scenario assumptions lookup failed: {e}")
+        return None
+
+    if row is None:
+        return None
+    entry = {"assumptions": row.assumptions, "timestamp": row.timestamp}
+    assumptions_cache[key] = entry
+    return entry
+
+def store_assumptions(db: Session, key: Tuple[str, str], assumptions: Dict[str, Any]):
+    timestamp = datetime.datetime.utcnow()
+    assumptions_cache[key] = {"assumptions": assumptions, "timestamp": timestamp}
+    try:
+        db.query(ScenarioAssumptionEntry).filter(
+            ScenarioAssumptionEntry.topic_name == key[0],
+            ScenarioAssumptionEntry.scenario_type == key[1]
+        ).delete()
+        db.add(ScenarioAssumptionEntry(topic_name=key[0], scenario_type=key[1], assumptions=assumptions, timestamp=timestamp))
+        db.commit()
+    except Exception as e:
+        print(f"Failed to persist scenario assumptions {key[0]}/{key[1]}: {e}")
+        db.rollback()
+
+async def fetch_assumptions(key: Tuple[str, str], scenario_type: str) -> Dict[str, Any]:
+    """
+    One model call, stored unless it failed. Uses its own session so a background
+    refresh outlives the request that triggered it.
+    """
+    assumptions = await augment_scenario_assumptions(key[0], scenario_type)
+    if "error" not in assumptions:
+        db = SessionLocal()
+        try:
+            store_assumptions(db, key, assumptions)
+        finally:
+            db.close()
+    return assumptions
+
+def refresh_task(key: Tuple[str, str], scenario_type: str) -> asyncio.Task:
+    task = pending.get(key)
+    if task is None:
+        task = asyncio.ensure_future(fetch_assumptions(key, scenario_type))
+        pending[key] = task
+        task.add_done_callback(lambda _: pending.pop(key, None))
+    return task
+
+async def get_scenario_assumptions(db: Session, topic_name: str, scenario_type: str, refresh: bool = False) -> Dict[str, Any]:
+    """
+    Cached augment_scenario_assumptions for a (topic, scenario type). Fresh entries are
+    returned directly, stale ones are returned while a background refresh runs, and
+    missing, expired or refresh=True entries wait for the model.
+    """
+    key = assumptions_key(topic_name, scenario_type)
+    entry = None if refresh else get_stored_assumptions(db, key)
+    age = datetime.datetime.utcnow() - entry["timestamp"] if entry is not None else None
+
+    if entry is None or age > ASSUMPTIONS_MAX_STALE:
+        return await refresh_task(key, scenario_type)
+    if age > ASSUMPTIONS_TTL:
+        refresh_task(key, scenario_type)
+    return entry["assumptions"]
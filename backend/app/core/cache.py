@@ -0,0 +1,48 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+class LRUCache:
+    """
+    Thread-safe in-process LRU cache with an optional time-to-live (seconds) per entry;
+    set() can give an entry a shorter lifetime than the cache default.
+    """
+    def __init__(self, maxsize: int = 256, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or (entry[1] is not None and time.monotonic() > entry[1]):
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl if ttl is not None else None)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
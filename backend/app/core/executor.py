@@ -0,0 +1,187 @@
+import asyncio
+import os
+from functools import partial
+import numpy as np
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import AsyncIterator, Dict, Any, Optional
+from .simulation import MonteCarloEngine, build_distribution, check_path_budget, check_run_options, engine as default_engine
+
+# Jobs are split into chunks of at least this many paths; splitting smaller ones costs
+# more than it saves. The count depends only on the path count, never on the pool size,
+# so a seeded run returns the same numbers on every host.
+MIN_PATHS_PER_CHUNK = 250_000
+
+class SimulationQueueFull(Exception):
+    """
+    Raised when more simulation jobs are in flight than the executor allows.
+    """
+    pass
+
+def _run_job(engine: MonteCarloEngine, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    return engine.run_simulation(**kwargs)
+
+def _call_engine(engine: MonteCarloEngine, method: str, args: tuple, kwargs: Dict[str, Any]):
+    return getattr(engine, method)(*args, **kwargs)
+
+def _run_chunk(engine: MonteCarloEngine, n: int, seed_seq: np.random.SeedSequence, kwargs: Dict[str, Any]):
+    rng = engine.make_rng(seed_seq)
+    if kwargs.get("chunk_size"):
+        return engine.accumulate_stream(
+            rng, n, kwargs["base_value"], kwargs["mu"], kwargs["sigma"], kwargs["portfolio_exposure"],
+            chunk_size=kwargs["chunk_size"], variance_reduction=kwargs.get("variance_reduction", "none"),
+            float32=kwargs.get("float32", False)
+        )
+    return engine.simulate_batch(
+        rng, n, kwargs["base_value"], kwargs["mu"], kwargs["sigma"], kwargs["portfolio_exposure"],
+        kwargs.get("variance_reduction", "none")
+    )
+
+class SimulationExecutor:
+    """
+    Runs MonteCarloEngine jobs off the event loop. Large jobs are split into chunks with
+    independent RNG streams spawned from one SeedSequence, fanned out over a process
+    pool (which runs as many at once as it has workers) and merged. A pool size of 0 uses a thread pool instead (e.g. on serverless
+    hosts without multiprocessing support).
+    """
+    def __init__(self, engine: MonteCarloEngine, max_workers: Optional[int] = None, max_queue: Optional[int] = None):
+        self.engine = engine
+        self.max_workers = (os.cpu_count() or 1) if max_workers is None else max_workers
+        self.max_queue = max_queue if max_queue is not None else 4 * max(self.max_workers, 1)
+        self.in_flight = 0
+        self._pool: Optional[Executor] = None
+
+    @property
+    def pool(self) -> Executor:
+        if self._pool is None:
+            if self.max_workers > 0:
+                try:
+                    self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+                except (OSError, NotImplementedError) as e:
+                    print(f"Process pool unavailable, falling back to threads: {e}")
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=max(self.max_workers, 1))
+        return self._pool
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def _admit(self, start_job):
+        if self.in_flight >= self.max_queue:
+            raise SimulationQueueFull(f"Simulation queue is full ({self.max_queue} jobs in flight)")
+
+        self.in_flight += 1
+        try:
+            return await start_job()
+        finally:
+            self.in_flight -= 1
+
+    async def run_simulation(self, **kwargs) -> Dict[str, Any]:
+        """
+        Awaitable counterpart of MonteCarloEngine.run_simulation with the same keyword arguments.
+        """
+        return await self._admit(lambda: self._dispatch(kwargs))
+
+    async def call_function(self, fn, *args, **kwargs):
+        """
+        Runs a picklable callable (e.g. another engine's bound method) in the pool under the same queue limit.
+        """
+        loop = asyncio.get_running_loop()
+        return await self._admit(lambda: loop.run_in_executor(self.pool, partial(fn, *args, **kwargs)))
+
+    async def call(self, method: str, *args, **kwargs):
+        """
+        Runs any other engine method (e.g. run_sweep) in the pool, subject to the same queue limit.
+        """
+        loop = asyncio.get_running_loop()
+        return await self._admit(lambda: loop.run_in_executor(self.pool, _call_engine, self.engine, method, args, kwargs))
+
+    def stream_simulation(self, **kwargs) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Async iterator over MonteCarloEngine.iter_batches, one thread hop per batch so the
+        loop stays free and the caller can stop between batches. Admission is checked
+        here, before the first batch, so a full queue can still be reported as an error.
+        """
+        if self.in_flight >= self.max_queue:
+            raise SimulationQueueFull(f"Simulation queue is full ({self.max_queue} jobs in flight)")
+        return self._iter_batches(kwargs)
+
+    async def _iter_batches(self, kwargs: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        self.in_flight += 1
+        try:
+            engine = self.engine.with_model(kwargs.pop("model", None), kwargs.pop("model_params", None))
+            engine = engine.with_steps(kwargs.pop("steps", None))
+            batches = engine.iter_batches(**kwargs)
+            while True:
+                summary = await asyncio.to_thread(next, batches, None)
+                if summary is None:
+                    return
+                yield summary
+        finally:
+            self.in_flight -= 1
+
+    async def _dispatch(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        # Chunked runs bypass run_simulation, so its argument checks run here first
+        check_run_options(kwargs.get("method", "monte_carlo"), kwargs.get("risk_levels"))
+        engine = self.engine.with_model(kwargs.pop("model", None), kwargs.pop("model_params", None))
+        engine = engine.with_steps(kwargs.pop("steps", None))
+
+        # Closed-form results take microseconds, so they never leave the loop
+        if kwargs.get("method") == "analytic" and engine.model.closed_form:
+            return engine.run_simulation(**kwargs)
+
+        loop = asyncio.get_running_loop()
+        n = kwargs.get("paths") or engine.paths
+        chunks = n // MIN_PATHS_PER_CHUNK
+        full_paths = kwargs.get("fan_chart") or kwargs.get("thresholds") or kwargs.get("drawdown")
+        if full_paths:
+            # Refused here rather than after a worker has started allocating the grid
+            check_path_budget(n, engine.steps)
+
+        # Adaptive and full-path runs are not split, nor are runs too small to benefit
+        if kwargs.get("tolerance") is not None or full_paths or chunks < 2:
+            return await loop.run_in_executor(self.pool, _run_job, engine, kwargs)
+
+        seed = kwargs.get("seed")
+        children = np.random.SeedSequence(engine.seed if seed is None else seed).spawn(chunks)
+        sizes = [len(part) for part in np.array_split(np.arange(n), chunks)]
+
+        parts = await asyncio.gather(*[
+            loop.run_in_executor(self.pool, _run_chunk, engine, size, child, kwargs)
+            for size, child in zip(sizes, children)
+        ])
+
+        mu = kwargs["mu"]
+        risk_levels = kwargs.get("risk_levels")
+        histogram_bins, cdf_points = kwargs.get("histogram_bins"), kwargs.get("cdf_points")
+        distribution = (histogram_bins, cdf_points) if histogram_bins or cdf_points else None
+        if kwargs.get("chunk_size"):
+            sketch, moments, estimates, sensitivities = parts[0]
+            for other_sketch, other_moments, other_estimates, other_sensitivities in parts[1:]:
+                sketch.merge(other_sketch)
+                moments.merge(other_moments)
+                estimates.extend(other_estimates)
+                sensitivities.extend(other_sensitivities)
+            summary = engine.finalize_stream(sketch, moments, estimates, sensitivities, mu, distribution=distribution, risk_levels=risk_levels)
+        else:
+            results = np.concatenate([part[0] for part in parts])
+            estimate = engine.pool_estimates([(len(part[0]), part[1]) for part in parts])
+            summary = engine.summarize(results, mu, estimate, risk_levels)
+            engine.attach_sensitivities(summary, engine.pool_sensitivities([(len(part[0]), part[2]) for part in parts]))
+            if distribution:
+                summary["distribution"] = build_distribution(results, *distribution)
+
+        summary["estimator"] = kwargs.get("variance_reduction", "none")
+        return summary
+
+def _env_int(name: str, default: Optional[int] = None) -> Optional[int]:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+# Singleton instance. Serverless functions get threads unless a pool size is configured.
+executor = SimulationExecutor(
+    default_engine,
+    max_workers=_env_int("SIMULATION_POOL_SIZE", 0 if os.getenv("VERCEL") == "1" else None),
+    max_queue=_env_int("SIMULATION_MAX_QUEUE")
+)
@@ -0,0 +1,105 @@
+import datetime
+import hashlib
+import json
+import re
+import unicodedata
+from typing import Dict, Any, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from ..models.models import TechnologyDomain, ResearchEntry, InterrogationCacheEntry
+from .cache import LRUCache
+
+# Answers are reused for this long unless the topic's context changes first
+INTERROGATION_CACHE_TTL = datetime.timedelta(hours=6)
+
+memory_cache = LRUCache(maxsize=1024, ttl=INTERROGATION_CACHE_TTL.total_seconds())
+
+def normalize_query(query: str) -> str:
+    """
+    Case, Unicode form, whitespace and trailing punctuation do not change the question.
+    """
+    normalized = unicodedata.normalize("NFKC", query).casefold()
+    normalized = re.sub(r"\s+", " ", normalized).strip()
+    return normalized.rstrip("?!. ")
+
+def context_hash(db: Session, topic_id: str) -> str:
+    """
+    Hash of everything the answer is grounded on: the domain fields in the prompt and
+    every research entry for the topic, so adding or editing research changes the key.
+    """
+    domain = db.query(TechnologyDomain).filter(TechnologyDomain.topic_id == topic_id).first()
+    research = db.query(ResearchEntry).filter(ResearchEntry.topic_id == topic_id).order_by(ResearchEntry.id).all()
+
+    context = {
+        "domain": [domain.name, domain.why_it_matters, domain.insight, domain.trl, domain.reliability_score, domain.evidence_level] if domain else None,
+        "research": [[r.id, r.title, r.summary, r.status, r.timestamp] for r in research]
+    }
+    canonical = json.dumps(context, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+def interrogation_cache_key(topic_id: str, query: str, context: str) -> str:
+    payload = json.dumps([topic_id, normalize_query(query), context])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def remaining_ttl(timestamp: datetime.datetime) -> float:
+    """
+    Seconds an answer created at timestamp may still be served.
+    """
+    return (timestamp + INTERROGATION_CACHE_TTL - datetime.datetime.utcnow()).total_seconds()
+
+def get_cached_response(db: Session, key: str) -> Optional[Dict[str, Any]]:
+    response = memory_cache.get(key)
+    if response is not None:
+        return response
+
+    try:
+        entry = db.query(InterrogationCacheEntry).filter(InterrogationCacheEntry.cache_key == key).first()
+    except Exception as e:
+        print(f"Interrogation cache lookup failed: {e}")
+        return None
+
+    if entry is None or remaining_ttl(entry.timestamp) <= 0:
+        return None
+    # Held in memory only for what is left of the persisted answer's lifetime
+    memory_cache.set(key, entry.response, ttl=remaining_ttl(entry.timestamp))
+    return entry.response
+
+def get_topic_responses(db: Session, topic_id: str, context: str) -> List[Tuple[str, Dict[str, Any], datetime.datetime]]:
+    """
+    Unexpired (query, response, timestamp) triples answered against the given context, oldest first.
+    """
+    cutoff = datetime.datetime.utcnow() - INTERROGATION_CACHE_TTL
+    try:
+        entries = db.query(InterrogationCacheEntry).filter(
+            InterrogationCacheEntry.topic_id == topic_id,
+            InterrogationCacheEntry.context_hash == context,
+            InterrogationCacheEntry.timestamp > cutoff
+        ).order_by(InterrogationCacheEntry.timestamp).all()
+    except Exception as e:
+        print(f"Interrogation cache lookup failed: {e}")
+        return []
+    return [(entry.query, entry.response, entry.timestamp) for entry in entries]
+
+def store_response(db: Session, key: str, topic_id: str, context: str, query: str, response: Dict[str, Any]):
+    memory_cache.set(key, response)
+    try:
+        db.query(InterrogationCacheEntry).filter(InterrogationCacheEntry.cache_key == key).delete()
+        db.add(InterrogationCacheEntry(
+            cache_key=key, topic_id=topic_id, context_hash=context,
+            query=normalize_query(query), response=response
+        ))
+        db.commit()
+    except Exception as e:
+        print(f"Failed to persist interrogation response {key[:12]}: {e}")
+        db.rollback()
+
+def invalidate_topic(db: Session, topic_id: str):
+    """
+    Drops a topic's persisted answers after its research changes. In-memory entries are
+    already unreachable because the context hash is part of their key.
+    """
+    try:
+        db.query(InterrogationCacheEntry).filter(InterrogationCacheEntry.topic_id == topic_id).delete()
+        db.commit()
+    except Exception as e:
+        print(f"Failed to invalidate interrogation cache for {topic_id}: {e}")
+        db.rollback()
@@ -0,0 +1,154 @@
+import numpy as np
+from typing import Dict, Any, Optional, Tuple
+
+class PathModel:
+    """
+    A stochastic model for the value index S_t = base * exp(log growth). Models turn a
+    batch of Brownian values W at the given times, shape (n, len(times)), into
+    cumulative log growth of the same shape in one array pass, so variance reduction
+    on W carries over to every model. path_dependent models need the full yearly grid;
+    the others can be sampled at the terminal time alone.
+    """
+    name = "base"
+    path_dependent = False
+    closed_form = False
+    defaults: Dict[str, float] = {}
+
+    def __init__(self, **params: float):
+        unknown = set(params) - set(self.defaults)
+        if unknown:
+            raise ValueError(f"Unknown parameters for model '{self.name}': {', '.join(sorted(unknown))}")
+        self.params = {**self.defaults, **{k: float(v) for k, v in params.items()}}
+        for key, value in self.params.items():
+            setattr(self, key, value)
+        self.validate()
+
+    def validate(self):
+        pass
+
+    @property
+    def key(self) -> Tuple:
+        return (self.name, tuple(sorted(self.params.items())))
+
+    def log_growth(
+        self,
+        rng: np.random.Generator,
+        W: np.ndarray,
+        times: np.ndarray,
+        mu: float,
+        sigma: float
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns cumulative log growth at each time and d(log growth at the last time) / d sigma
+        per path, the latter for the pathwise sigma sensitivity.
+        """
+        raise NotImplementedError
+
+    def expected_growth(self, mu: float, t: float) -> float:
+        """
+        E[S_t] / S_0. mu is the expected growth rate in every model, so this is exp(mu * t)
+        unless regimes shift the drift.
+        """
+        return float(np.exp(mu * t))
+
+class GBMModel(PathModel):
+    """
+    Geometric Brownian motion: log growth (mu - sigma^2/2) t + sigma W_t.
+    """
+    name = "gbm"
+    closed_form = True
+
+    def log_growth(self, rng, W, times, mu, sigma):
+        log_growth = (mu - 0.5 * sigma**2) * times + sigma * W
+        return log_growth, W[:, -1] - sigma * times[-1]
+
+class JumpDiffusionModel(PathModel):
+    """
+    Merton jump-diffusion: GBM plus a compound Poisson process of lognormal jumps
+    (e.g. export controls or a breakthrough). The drift is compensated by
+    jump_intensity * (E[e^J] - 1), so mu stays the expected growth rate. The number of
+    jumps per interval is Poisson and their summed size is normal given that count, so
+    no per-jump loop is needed.
+    """
+    name = "jump_diffusion"
+    defaults = {"jump_intensity": 0.2, "jump_mean": -0.2, "jump_std": 0.15}
+
+    def validate(self):
+        if self.jump_intensity < 0 or self.jump_std < 0:
+            raise ValueError("jump_intensity and jump_std must be non-negative")
+
+    def log_growth(self, rng, W, times, mu, sigma):
+        compensator = self.jump_intensity * (np.exp(self.jump_mean + 0.5 * self.jump_std**2) - 1.0)
+        intervals = np.diff(times, prepend=0.0)
+        counts = rng.poisson(self.jump_intensity * intervals, size=W.shape)
+        jumps = counts * self.jump_mean + np.sqrt(counts) * self.jump_std * rng.standard_normal(W.shape)
+        log_growth = (mu - 0.5 * sigma**2 - compensator) * times + sigma * W + np.cumsum(jumps, axis=1).astype(W.dtype, copy=False)
+        return log_growth, W[:, -1] - sigma * times[-1]
+
+class RegimeSwitchingModel(PathModel):
+    """
+    Two-state Markov regime switching on a yearly grid. In the calm regime growth follows
+    (mu, sigma); in the stressed regime the drift shifts by stress_drift and the volatility
+    is scaled by stress_vol_multiplier. Regimes switch at the start of each year with
+    probabilities enter_stress / exit_stress. All paths advance together as a state
+    vector, one array update per year.
+    """
+    name = "regime_switching"
+    path_dependent = True
+    defaults = {
+        "enter_stress": 0.1,
+        "exit_stress": 0.4,
+        "stress_drift": -0.15,
+        "stress_vol_multiplier": 2.0,
+        "initial_stress": 0.0
+    }
+
+    def validate(self):
+        for key in ("enter_stress", "exit_stress", "initial_stress"):
+            if not 0 <= self.params[key] <= 1:
+                raise ValueError(f"{key} must be a probability")
+        if self.stress_vol_multiplier < 0:
+            raise ValueError("stress_vol_multiplier must be non-negative")
+
+    def log_growth(self, rng, W, times, mu, sigma):
+        n, steps = W.shape
+        increments = np.diff(W, axis=1, prepend=0.0)
+        stressed = rng.random(n) < self.initial_stress
+        log_growth = np.empty_like(W)
+        dlog_dsigma = np.zeros(n)
+        total = np.zeros(n)
+
+        for k in range(steps):
+            if k > 0:
+                u = rng.random(n)
+                stressed = np.where(stressed, u >= self.exit_stress, u < self.enter_stress)
+            scale = np.where(stressed, self.stress_vol_multiplier, 1.0)
+            drift = mu + np.where(stressed, self.stress_drift, 0.0) - 0.5 * (sigma * scale)**2
+            total += drift + sigma * scale * increments[:, k]
+            dlog_dsigma += scale * increments[:, k] - sigma * scale**2
+            log_growth[:, k] = total
+
+        return log_growth, dlog_dsigma
+
+    def expected_growth(self, mu: float, t: float) -> float:
+        # Propagate the regime distribution weighted by the per-regime expected growth
+        steps = int(round(t))
+        transition = np.array([
+            [1 - self.enter_stress, self.enter_stress],
+            [self.exit_stress, 1 - self.exit_stress]
+        ])
+        growth = np.exp(mu + np.array([0.0, self.stress_drift]))
+        weights = np.array([1 - self.initial_stress, self.initial_stress]) * growth
+        for _ in range(steps - 1):
+            weights = (weights @ transition) * growth
+        return float(weights.sum())
+
+MODELS = {model.name: model for model in (GBMModel, JumpDiffusionModel, RegimeSwitchingModel)}
+
+def build_model(name: str = "gbm", params: Optional[Dict[str, Any]] = None) -> PathModel:
+    """
+    Looks up a model family by name and applies parameter overrides.
+    """
+    if name not in MODELS:
+        raise ValueError(f"Unknown simulation model: {name}")
+    return MODELS[name](**(params or {}))
@@ -0,0 +1,118 @@
+import numpy as np
+from typing import List, Dict, Any, Optional
+
+MAX_TRL = 9
+
+class RealOptionsEngine:
+    """
+    Values the option to commit capital to a deep-tech domain on Cox-Ross-Rubinstein
+    binomial lattices. The project value index starts at 1 with the scenario's volatility
+    sigma; the decision window is years_to_scale. Following McDonald-Siegel, a project
+    expected to grow at mu against a required return hurdle_rate has an opportunity cost
+    of waiting delta = max(hurdle_rate - mu, 0), which the lattice treats as a dividend
+    yield under risk-neutral valuation. Technical risk enters as a yearly failure hazard
+    that falls linearly to zero at TRL 9 and is added to the discount rate. All domains
+    share one step count and are rolled back together as (domains, nodes) arrays.
+    """
+    def __init__(
+        self,
+        steps: int = 200,
+        risk_free_rate: float = 0.04,
+        hurdle_rate: float = 0.12,
+        max_failure_hazard: float = 0.15
+    ):
+        self.steps = steps
+        self.risk_free_rate = risk_free_rate
+        self.hurdle_rate = hurdle_rate
+        self.max_failure_hazard = max_failure_hazard
+
+    def failure_hazards(self, trls: np.ndarray) -> np.ndarray:
+        return self.max_failure_hazard * (MAX_TRL - trls) / (MAX_TRL - 1)
+
+    def value(
+        self,
+        trls: List[int],
+        years_to_scale: List[int],
+        mus: List[float],
+        sigmas: List[float],
+        investment_cost: float = 1.0,
+        steps: Optional[int] = None,
+        risk_free_rate: Optional[float] = None,
+        hurdle_rate: Optional[float] = None,
+        american: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Returns per domain the option value (American unless american=False), the European
+        value, the static NPV of investing today, the value of flexibility over the better
+        of investing now or never, whether investing now is optimal, and the exercise
+        boundary: the lowest project value at which committing is optimal, at each whole
+        year (None where no lattice node at that date is worth exercising).
+        """
+        n = steps or self.steps
+        r = self.risk_free_rate if risk_free_rate is None else risk_free_rate
+        hurdle = self.hurdle_rate if hurdle_rate is None else hurdle_rate
+
+        trl_arr = np.clip(np.asarray(trls, dtype=np.float64), 1, MAX_TRL)
+        T = np.maximum(np.asarray(years_to_scale, dtype=np.float64), 1.0)[:, None]
+        mu = np.asarray(mus, dtype=np.float64)[:, None]
+        # A floor on sigma keeps the up/down moves distinct for near-deterministic scenarios
+        sigma = np.maximum(np.asarray(sigmas, dtype=np.float64), 1e-4)[:, None]
+        hazard = self.failure_hazards(trl_arr)[:, None]
+        delta = np.maximum(hurdle - mu, 0.0)
+
+        dt = T / n
+        up = np.exp(sigma * np.sqrt(dt))
+        down = 1.0 / up
+        p = np.clip((np.exp((r - delta) * dt) - down) / (up - down), 0.0, 1.0)
+        discount = np.exp(-(r + hazard) * dt)
+
+        # Node j at step i has value up^(2j - i)
+        j = np.arange(n + 1)
+        log_up = np.log(up)
+        values = np.maximum(np.exp((2 * j - n) * log_up) - investment_cost, 0.0)
+        european = values.copy()
+        boundary = np.full((len(trl_arr), n + 1), np.inf)
+        boundary[:, n] = np.where(values > 0, np.exp((2 * j - n) * log_up), np.inf).min(axis=1)
+
+        for i in range(n - 1, -1, -1):
+            continuation = discount * (p * values[:, 1:i + 2] + (1 - p) * values[:, :i + 1])
+            european = discount * (p * european[:, 1:i + 2] + (1 - p) * european[:, :i + 1])
+            if american:
+                project = np.exp((2 * j[:i + 1] - i) * log_up)
+                exercise = project - investment_cost
+                optimal = (exercise >= continuation) & (exercise > 0)
+                boundary[:, i] = np.where(optimal, project, np.inf).min(axis=1)
+                values = np.where(optimal, exercise, continuation)
+            else:
+                values = continuation
+
+        option_value = values[:, 0]
+        european_value = european[:, 0]
+        npv = 1.0 - investment_cost
+
+        years = np.arange(0, int(T.max()) + 1)
+        boundary_by_year = []
+        for d in range(len(trl_arr)):
+            row = []
+            for year in years[years <= T[d, 0]]:
+                level = boundary[d, min(int(round(year / dt[d, 0])), n)]
+                row.append(float(level) if np.isfinite(level) and american else None)
+            boundary_by_year.append(row)
+
+        return {
+            "steps": n,
+            "risk_free_rate": r,
+            "hurdle_rate": hurdle,
+            "investment_cost": investment_cost,
+            "failure_hazards": hazard[:, 0].tolist(),
+            "opportunity_costs": delta[:, 0].tolist(),
+            "option_values": option_value.tolist(),
+            "european_values": european_value.tolist(),
+            "static_npv": npv,
+            "flexibility_values": (option_value - max(npv, 0.0)).tolist(),
+            "invest_now": [bool(american and b <= 1.0) for b in boundary[:, 0]],
+            "exercise_boundary": boundary_by_year
+        }
+
+# Singleton instance
+options_engine = RealOptionsEngine()
@@ -0,0 +1,115 @@
+import datetime
+import hashlib
+import json
+from typing import Dict, Any, Optional, Tuple
+from sqlalchemy.orm import Session
+from ..models.models import TechnologyDomain, ScenarioAtlasEntry
+
+# The default scenarios and DeepTech allocations precomputed for every domain
+ATLAS_SCENARIO_TYPES = ("base", "bull", "bear")
+ATLAS_EXPOSURES = (0.05, 0.1, 0.2, 0.3)
+
+# Entries older than this are served only until the next refresh rebuilds them
+ATLAS_MAX_AGE = datetime.timedelta(hours=24)
+ATLAS_REFRESH_INTERVAL = 15 * 60 # Seconds between background freshness checks
+
+# (topic_id, scenario_type) -> {"fingerprint", "timestamp", "results"}
+atlas: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+def atlas_fingerprint(domain: TechnologyDomain, assumptions: Dict[str, Any]) -> str:
+    """
+    Hash of the domain fields and the AI assumptions an entry was built from; editing the
+    domain or refreshing its assumptions invalidates the atlas rows.
+    """
+    fields = {
+        "name": domain.name,
+        "why_it_matters": domain.why_it_matters,
+        "trl": domain.trl,
+        "years_to_scale": domain.years_to_scale,
+        "reliability_score": domain.reliability_score,
+        "evidence_level": domain.evidence_level,
+        "assumptions": assumptions
+    }
+    canonical = json.dumps(fields, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+def atlas_scenario_type(scenario_type: str) -> Optional[str]:
+    normalized = scenario_type.strip().lower()
+    return normalized if normalized in ATLAS_SCENARIO_TYPES else None
+
+def atlas_exposure(exposure: float) -> Optional[str]:
+    """
+    Results are keyed by the exposure's string form; None if it is not a standard exposure.
+    """
+    for standard in ATLAS_EXPOSURES:
+        if abs(exposure - standard) < 1e-9:
+            return str(standard)
+    return None
+
+def get_atlas_entry(db: Session, topic_id: str, scenario_type: str) -> Optional[Dict[str, Any]]:
+    entry = atlas.get((topic_id, scenario_type))
+    if entry is not None:
+        return entry
+
+    try:
+        row = db.query(ScenarioAtlasEntry).filter(
+            ScenarioAtlasEntry.topic_id == topic_id,
+            ScenarioAtlasEntry.scenario_type == scenario_type
+        ).first()
+    except Exception as e:
+        print(f"Scenario atlas lookup failed: {e}")
+        return None
+
+    if row is None:
+        return None
+    entry = {"fingerprint": row.fingerprint, "timestamp": row.timestamp, "results": row.results}
+    atlas[(topic_id, scenario_type)] = entry
+    return entry
+
+def is_fresh(entry: Optional[Dict[str, Any]], fingerprint: str) -> bool:
+    if entry is None or entry["fingerprint"] != fingerprint:
+        return False
+    return datetime.datetime.utcnow() - entry["timestamp"] < ATLAS_MAX_AGE
+
+def get_atlas_result(
+    db: Session,
+    topic_id: str,
+    scenario_type: str,
+    exposure: float,
+    assumptions: Dict[str, Any]
+) -> Optional[Dict[str, Any]]:
+    """
+    Precomputed response for a default request, or None when the request is not covered or
+    the domain or its current assumptions differ from those the entry was built with (the
+    caller then runs live).
+    """
+    scenario_type = atlas_scenario_type(scenario_type)
+    exposure_key = atlas_exposure(exposure)
+    if scenario_type is None or exposure_key is None:
+        return None
+
+    domain = db.query(TechnologyDomain).filter(TechnologyDomain.topic_id == topic_id).first()
+    if domain is None:
+        return None
+
+    entry = get_atlas_entry(db, topic_id, scenario_type)
+    if not is_fresh(entry, atlas_fingerprint(domain, assumptions)):
+        return None
+    return entry["results"].get(exposure_key)
+
+def store_atlas_entry(db: Session, topic_id: str, scenario_type: str, fingerprint: str, results: Dict[str, Any]):
+    timestamp = datetime.datetime.utcnow()
+    atlas[(topic_id, scenario_type)] = {"fingerprint": fingerprint, "timestamp": timestamp, "results": results}
+    try:
+        db.query(ScenarioAtlasEntry).filter(
+            ScenarioAtlasEntry.topic_id == topic_id,
+            ScenarioAtlasEntry.scenario_type == scenario_type
+        ).delete()
+        db.add(ScenarioAtlasEntry(
+            topic_id=topic_id, scenario_type=scenario_type, fingerprint=fingerprint,
+            results=results, timestamp=timestamp
+        ))
+        db.commit()
+    except Exception as e:
+        print(f"Failed to persist atlas entry {topic_id}/{scenario_type}: {e}")
+        db.rollback()
@@ -0,0 +1,52 @@
+import datetime
+import hashlib
+import json
+from typing import Dict, Any, Optional
+from sqlalchemy.orm import Session
+from ..models.models import ScenarioRun
+from .cache import LRUCache
+from .simulation import ENGINE_VERSION
+
+# Results are reused for this long; older rows are ignored and pruned as new runs are stored
+SCENARIO_RUN_TTL = datetime.timedelta(days=7)
+
+# Hot results stay in process; everything is also persisted to the scenario_runs table
+memory_cache = LRUCache(maxsize=512, ttl=SCENARIO_RUN_TTL.total_seconds())
+
+def scenario_cache_key(params: Dict[str, Any]) -> str:
+    """
+    Content address of a simulation: SHA-256 of the engine version and its canonical JSON
+    parameters, so results from an older engine are never served.
+    """
+    canonical = json.dumps({"engine": ENGINE_VERSION, "params": params}, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+def get_cached_run(db: Session, key: str) -> Optional[Dict[str, Any]]:
+    result = memory_cache.get(key)
+    if result is not None:
+        return result
+
+    cutoff = datetime.datetime.utcnow() - SCENARIO_RUN_TTL
+    try:
+        run = db.query(ScenarioRun).filter(ScenarioRun.cache_key == key, ScenarioRun.timestamp > cutoff).first()
+    except Exception as e:
+        print(f"Scenario cache lookup failed: {e}")
+        return None
+
+    if run is None:
+        return None
+    # Held in memory only for what is left of the persisted run's lifetime
+    memory_cache.set(key, run.result, ttl=(run.timestamp - cutoff).total_seconds())
+    return run.result
+
+def store_run(db: Session, key: str, params: Dict[str, Any], result: Dict[str, Any]):
+    memory_cache.set(key, result)
+    cutoff = datetime.datetime.utcnow() - SCENARIO_RUN_TTL
+    try:
+        # Expired rows, and a stale row under this key, are replaced rather than kept forever
+        db.query(ScenarioRun).filter((ScenarioRun.timestamp <= cutoff) | (ScenarioRun.cache_key == key)).delete(synchronize_session=False)
+        db.add(ScenarioRun(cache_key=key, params=params, result=result))
+        db.commit()
+    except Exception as e:
+        print(f"Failed to persist scenario run {key[:12]}: {e}")
+        db.rollback()
@@ -0,0 +1,231 @@
+import datetime
+import os
+import re
+import threading
+import zlib
+import numpy as np
+from typing import Dict, Any, List, Optional, Tuple
+from .interrogation_cache import normalize_query, remaining_ttl
+
+EMBEDDING_DIM = 2**11
+MAX_QUERIES_PER_TOPIC = 256
+
+# Cosine similarity above which a cached answer is reused for a differently worded query
+SEMANTIC_SIMILARITY_THRESHOLD = float(os.getenv("INTERROGATION_SIMILARITY_THRESHOLD") or 0.8)
+
+# Relative weights of whole words and of character trigrams (which catch inflections)
+WORD_WEIGHT = 1.0
+TRIGRAM_WEIGHT = 0.3
+
+# Negations are kept as tokens, and a query only matches cached queries of the same
+# polarity: "is x a constraint" and "is x not a constraint" share every other word
+NEGATIONS = frozenset(["not", "no", "never", "nor", "without"])
+
+# Words (after stemming) that name the same concept in questions about a topic; each is
+# replaced by its concept, so "is grid capacity a bottleneck" and "does power constrain
+# scaling" share their terms
+CONCEPTS = {
+    "power": ("power", "energy", "electricity", "electric", "electrical", "grid"),
+    "constraint": ("constraint", "constrain", "bottleneck", "limit", "limitation", "restrict", "restriction", "ceiling", "hinder", "block"),
+    "scale": ("scale", "scal", "capacity", "growth", "grow", "expand", "expansion", "buildout"),
+    "cost": ("cost", "price", "pric", "expensive", "cheap", "afford", "affordable"),
+    "risk": ("risk", "danger", "threat", "hazard", "exposure"),
+    "adoption": ("adoption", "adopt", "uptake", "deployment", "deploy", "rollout"),
+    "regulation": ("regulation", "regulat", "regulatory", "policy", "law", "legislation"),
+    "ai": ("ai", "ml", "artificial", "intelligence")
+}
+SYNONYMS = {word: concept for concept, words in CONCEPTS.items() for word in words}
+
+STOPWORDS = frozenset("""
+a an the and or but if of to in on at by for with from as into about over under than then
+is are was were be been being do does did has have had can could will would should may might
+what which who whom whose how why when where this that these those it its there their them
+they we you your our i me my any some more most much many such so very just
+""".split())
+
+def tokenize(text: str) -> List[str]:
+    """
+    Content words of a normalized query, in order, with a light suffix stemmer and
+    synonyms folded into their concept.
+    """
+    tokens = []
+    # "isn't" -> "is not", so contracted negations survive tokenization
+    text = re.sub(r"n['’]t\b", " not", normalize_query(text))
+    for word in re.findall(r"[a-z0-9]+", text):
+        if word in STOPWORDS:
+            continue
+        for suffix in ("ing", "ed", "es", "s"):
+            if len(word) > len(suffix) + 3 and word.endswith(suffix):
+                word = word[:-len(suffix)]
+                break
+        tokens.append(SYNONYMS.get(word, word))
+    return tokens
+
+def negated(text: str) -> bool:
+    return sum(token in NEGATIONS for token in tokenize(text)) % 2 == 1
+
+def same_order(terms: List[str], other: List[str]) -> bool:
+    """
+    False when three terms two queries share appear in reverse order, e.g. "does AI
+    scaling constrain power" against "does power constrain AI scaling": the words match
+    but subject and object have swapped around the relation, so the answers do not.
+    Other reorderings ("is grid capacity a bottleneck for AI") still match.
+    """
+    positions = {}
+    for i, term in enumerate(other):
+        positions.setdefault(term, i)
+    shared = [positions[term] for term in dict.fromkeys(terms) if term in positions]
+    for j in range(1, len(shared) - 1):
+        if max(shared[:j]) > shared[j] > min(shared[j + 1:]):
+            return False
+    return True
+
+def _bucket(feature: str) -> Tuple[int, float]:
+    # crc32 is stable across processes, unlike hash(); the top bit picks the sign
+    h = zlib.crc32(feature.encode())
+    return h % EMBEDDING_DIM, 1.0 if h >> 31 else -1.0
+
+def term_frequencies(text: str) -> np.ndarray:
+    """
+    Hashed term-frequency vector of words and in-word character trigrams (sublinear tf).
+    IDF weights are applied at query time from the topic's index.
+    """
+    counts = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+    for word in tokenize(text):
+        index, sign = _bucket("w:" + word)
+        counts[index] += sign * WORD_WEIGHT
+        padded = f"<{word}>"
+        for i in range(len(padded) - 2):
+            index, sign = _bucket("c:" + padded[i:i + 3])
+            counts[index] += sign * TRIGRAM_WEIGHT
+    return np.sign(counts) * np.log1p(np.abs(counts))
+
+class SemanticQueryIndex:
+    """
+    Per-topic vector index of answered queries. Each topic holds the term-frequency matrix
+    of its cached queries and their document frequencies; a lookup weights the matrix and
+    the query by IDF and takes cosine similarities in one matrix-vector product; candidates
+    of the opposite polarity or with subject and object swapped are ruled out. A topic's
+    index is tied to the context hash it was built under and is dropped when that changes,
+    and entries older than the interrogation cache TTL are pruned before each lookup.
+    """
+    def __init__(self, threshold: float = SEMANTIC_SIMILARITY_THRESHOLD, max_queries: int = MAX_QUERIES_PER_TOPIC):
+        self.threshold = threshold
+        self.max_queries = max_queries
+        self.lookups = 0
+        self.hits = 0
+        self.similarity_sum = 0.0
+        self._topics: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _empty(self, context: str) -> Dict[str, Any]:
+        return {
+            "context": context,
+            "queries": [],
+            "responses": [],
+            "timestamps": [],
+            "negated": [],
+            "terms": [],
+            "tf": np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+        }
+
+    def has_topic(self, topic_id: str, context: str) -> bool:
+        index = self._topics.get(topic_id)
+        return index is not None and index["context"] == context
+
+    def load(self, topic_id: str, context: str, entries: List[Tuple[str, Dict[str, Any], datetime.datetime]]):
+        """
+        Rebuilds a topic's index from persisted (query, response, timestamp) triples, e.g. after a cold start.
+        """
+        with self._lock:
+            self._topics[topic_id] = self._empty(context)
+        for query, response, timestamp in entries[-self.max_queries:]:
+            self.add(topic_id, context, query, response, timestamp)
+
+    def _prune(self, index: Dict[str, Any]):
+        live = [remaining_ttl(t) > 0 for t in index["timestamps"]]
+        if not all(live):
+            for field in ("queries", "responses", "timestamps", "negated", "terms"):
+                index[field] = [item for item, keep in zip(index[field], live) if keep]
+            index["tf"] = index["tf"][np.array(live, dtype=bool)]
+
+    def add(
+        self,
+        topic_id: str,
+        context: str,
+        query: str,
+        response: Dict[str, Any],
+        timestamp: Optional[datetime.datetime] = None
+    ):
+        tf = term_frequencies(query)
+        if not tf.any():
+            return
+        with self._lock:
+            index = self._topics.get(topic_id)
+            if index is None or index["context"] != context:
+                index = self._topics[topic_id] = self._empty(context)
+            index["queries"].append(normalize_query(query))
+            index["responses"].append(response)
+            index["timestamps"].append(timestamp or datetime.datetime.utcnow())
+            index["negated"].append(negated(query))
+            index["terms"].append(tokenize(query))
+            index["tf"] = np.vstack([index["tf"], tf])[-self.max_queries:]
+            for field in ("queries", "responses", "timestamps", "negated", "terms"):
+                del index[field][:-self.max_queries]
+
+    def invalidate(self, topic_id: str):
+        with self._lock:
+            self._topics.pop(topic_id, None)
+
+    def lookup(self, topic_id: str, context: str, query: str) -> Optional[Tuple[Dict[str, Any], float, str, datetime.datetime]]:
+        """
+        Returns (response, similarity, matched query, answer timestamp) for the most similar
+        unexpired cached query above the threshold, or None.
+        """
+        with self._lock:
+            self.lookups += 1
+            index = self._topics.get(topic_id)
+            if index is None or index["context"] != context:
+                return None
+            self._prune(index)
+            if not index["queries"]:
+                return None
+
+            tf = index["tf"]
+            q = term_frequencies(query)
+            df = np.count_nonzero(tf, axis=0)
+            idf = np.log((1 + len(tf)) / (1 + df)) + 1.0
+
+            docs = tf * idf
+            q = q * idf
+            norms = np.linalg.norm(docs, axis=1) * np.linalg.norm(q)
+            if not norms.any():
+                return None
+            similarities = np.divide(docs @ q, norms, out=np.zeros(len(tf), dtype=np.float32), where=norms > 0)
+            similarities[np.array(index["negated"]) != negated(query)] = 0.0
+            terms = tokenize(query)
+            for candidate in np.flatnonzero(similarities >= self.threshold):
+                if not same_order(terms, index["terms"][candidate]):
+                    similarities[candidate] = 0.0
+            best = int(np.argmax(similarities))
+            similarity = float(similarities[best])
+            if similarity < self.threshold:
+                return None
+
+            self.hits += 1
+            self.similarity_sum += similarity
+            return index["responses"][best], similarity, index["queries"][best], index["timestamps"][best]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "threshold": self.threshold,
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+            "mean_hit_similarity": self.similarity_sum / self.hits if self.hits else None,
+            "topics": len(self._topics),
+            "queries": sum(len(index["queries"]) for index in self._topics.values())
+        }
+
+# Singleton instance
+semantic_index = SemanticQueryIndex()
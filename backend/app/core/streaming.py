@@ -0,0 +1,130 @@
+import numpy as np
+from typing import List, Optional, Tuple
+
+class RunningMoments:
+    """
+    Streaming count / mean / sum of squared deviations (Welford), merged batch-wise
+    with Chan's parallel update so whole arrays can be folded in at once.
+    """
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+    def update(self, values: np.ndarray):
+        if len(values) == 0:
+            return
+        batch = RunningMoments()
+        batch.n = len(values)
+        batch.mean = float(values.mean(dtype=np.float64))
+        deviations = values.astype(np.float64) - batch.mean
+        batch.m2 = float(np.dot(deviations, deviations))
+        batch.min = float(values.min())
+        batch.max = float(values.max())
+        self.merge(batch)
+
+    def merge(self, other: "RunningMoments"):
+        if other.n == 0:
+            return
+        total = self.n + other.n
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.n * other.n / total
+        self.mean += delta * other.n / total
+        self.n = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / self.n if self.n else 0.0
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self.variance))
+
+class QuantileSketch:
+    """
+    Mergeable KLL-style quantile sketch. Items live in levels of compactors; an item at
+    level h stands for 2**h inputs. Level capacities shrink geometrically below the top
+    level, so memory stays around 3k items regardless of how many values are streamed.
+    """
+    def __init__(self, k: int = 2048, dtype=np.float64, seed: Optional[int] = None):
+        self.k = k
+        self.dtype = np.dtype(dtype)
+        self.n = 0
+        self.levels: List[np.ndarray] = [np.empty(0, dtype=self.dtype)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - 1 - level
+        return max(8, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def update(self, values: np.ndarray):
+        self.levels[0] = np.concatenate([self.levels[0], np.asarray(values, dtype=self.dtype)])
+        self.n += len(values)
+        self._compress()
+
+    def merge(self, other: "QuantileSketch"):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0, dtype=self.dtype))
+        for h, items in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], items.astype(self.dtype)])
+        self.n += other.n
+        self._compress()
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            items = self.levels[h]
+            if len(items) > self._capacity(h):
+                items = np.sort(items)
+                # An odd leftover stays behind so weights remain exact
+                keep = items[len(items) - len(items) % 2:]
+                promoted = items[self._rng.integers(2):len(items) - len(items) % 2:2]
+                self.levels[h] = keep
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0, dtype=self.dtype))
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+                # Capacities depend on the level count, so start over from the bottom
+                h = 0
+                continue
+            h += 1
+
+    @property
+    def size(self) -> int:
+        return sum(len(items) for items in self.levels)
+
+    def weighted_items(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Retained items and the number of inputs each one stands for.
+        """
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2**h, dtype=np.int64) for h, level in enumerate(self.levels)])
+        return items, weights
+
+    def quantiles(self, qs: List[float]) -> List[float]:
+        """
+        Returns the items whose cumulative weight first reaches each q * n.
+        """
+        items, weights = self.weighted_items()
+        order = np.argsort(items, kind="stable")
+        items = items[order]
+        cumulative = np.cumsum(weights[order])
+        targets = np.asarray(qs, dtype=np.float64) * cumulative[-1]
+        idx = np.minimum(np.searchsorted(cumulative, targets, side="right"), len(items) - 1)
+        return [float(x) for x in items[idx]]
+
+    def lower_tail_means(self, qs: List[float]) -> List[float]:
+        """
+        Weighted mean of the retained items up to each q-quantile (as chosen by quantiles).
+        """
+        items, weights = self.weighted_items()
+        order = np.argsort(items, kind="stable")
+        items = items[order].astype(np.float64)
+        cumulative = np.cumsum(weights[order])
+        totals = np.cumsum(items * weights[order])
+        targets = np.asarray(qs, dtype=np.float64) * cumulative[-1]
+        idx = np.minimum(np.searchsorted(cumulative, targets, side="right"), len(items) - 1)
+        return [float(x) for x in totals[idx] / cumulative[idx]]
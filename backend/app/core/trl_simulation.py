@@ -0,0 +1,69 @@
+import numpy as np
+from typing import List, Dict, Any, Optional
+
+MAX_TRL = 9
+
+class TRLProgressionEngine:
+    """
+    Models technology readiness as a yearly Markov chain per domain: each year a domain
+    below TRL 9 advances one level with probability p, slips back one level with a small
+    setback probability, and otherwise stays. p is calibrated so that the expected time
+    from the current TRL to TRL 9 equals years_to_scale. TRL 9 is absorbing.
+    """
+    def __init__(self, paths: int = 10000, horizon: int = 15, setback_rate: float = 0.02, seed: Optional[int] = None):
+        self.paths = paths
+        self.horizon = horizon
+        self.setback_rate = setback_rate
+        self.seed = seed
+
+    def advance_probabilities(self, trls: np.ndarray, years_to_scale: np.ndarray) -> np.ndarray:
+        levels_left = MAX_TRL - trls
+        # With setbacks the net drift per year is p - setback, so solve levels_left / (p - setback) = years
+        p = levels_left / np.maximum(years_to_scale, 1) + self.setback_rate
+        return np.clip(p, 0.05, 0.95)
+
+    def simulate(
+        self,
+        trls: List[int],
+        years_to_scale: List[int],
+        horizon: Optional[int] = None,
+        paths: Optional[int] = None,
+        seed: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Simulates every domain's chain at once as a (domains, paths) state array and returns,
+        per domain, P(TRL 9 reached by year y) for y = 1..horizon and the median year of
+        reaching it (None if fewer than half the paths get there within the horizon).
+        """
+        horizon = horizon or self.horizon
+        n = paths or self.paths
+        rng = np.random.default_rng(self.seed if seed is None else seed)
+
+        trl_arr = np.clip(np.asarray(trls, dtype=np.int64), 1, MAX_TRL)
+        years_arr = np.asarray(years_to_scale, dtype=np.float64)
+        p = self.advance_probabilities(trl_arr, years_arr)[:, None]
+
+        state = np.repeat(trl_arr[:, None], n, axis=1).astype(np.int8)
+        reached = np.empty((len(trl_arr), horizon))
+        for year in range(horizon):
+            u = rng.random(state.shape)
+            step = (u < p).astype(np.int8) - (u > 1 - self.setback_rate).astype(np.int8)
+            active = state < MAX_TRL
+            state = np.where(active, np.clip(state + step, 1, MAX_TRL), state)
+            reached[:, year] = (state == MAX_TRL).mean(axis=1)
+
+        median_years = []
+        for curve in reached:
+            hit = np.nonzero(curve >= 0.5)[0]
+            median_years.append(int(hit[0]) + 1 if len(hit) else None)
+
+        return {
+            "horizon": horizon,
+            "paths": n,
+            "advance_probabilities": p[:, 0].tolist(),
+            "probability_trl9_by_year": reached.tolist(),
+            "median_years_to_trl9": median_years
+        }
+
+# Singleton instance
+trl_engine = TRLProgressionEngine()
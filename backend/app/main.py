@@ -10,7 +10,7 @@ import os
 from .core.database import engine
 from .models.base import Base
 # Import all models to ensure they are registered with Base.metadata
-from .models.models import TechnologyDomain, SubTheme, BriefAudit, AustraliaCase, AustraliaMetric, ResearchEntry, InterrogationHistory, EcosystemCompany
+from .models.models import TechnologyDomain, SubTheme, BriefAudit, AustraliaCase, AustraliaMetric, ResearchEntry, InterrogationHistory, EcosystemCompany, ScenarioRun, ScenarioAtlasEntry, InterrogationCacheEntry, ScenarioAssumptionEntry
 
 # Create tables if they don't exist
 # In production/Vercel, we prefer managed migrations or explicit seeding,
@@ -51,10 +51,40 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-from .api.endpoints import router as api_router
+from .api.endpoints import router as api_router, refresh_scenario_atlas
+from .core.executor import executor as sim_executor
+from .core.database import SessionLocal
+from .core.scenario_atlas import ATLAS_REFRESH_INTERVAL
+import asyncio
 
 app.include_router(api_router, prefix="/api/v1")
 
+atlas_task = None
+
+async def atlas_refresh_loop():
+    while True:
+        db = SessionLocal()
+        try:
+            await refresh_scenario_atlas(db)
+        except Exception as e:
+            print(f"Scenario atlas refresh error: {e}")
+        finally:
+            db.close()
+        await asyncio.sleep(ATLAS_REFRESH_INTERVAL)
+
+@app.on_event("startup")
+async def start_atlas_refresh():
+    # Serverless instances do not outlive the request; there the cron in vercel.json calls the refresh endpoint
+    global atlas_task
+    if os.getenv("VERCEL") != "1":
+        atlas_task = asyncio.create_task(atlas_refresh_loop())
+
+@app.on_event("shutdown")
+async def shutdown_simulation_pool():
+    if atlas_task is not None:
+        atlas_task.cancel()
+    sim_executor.shutdown()
+
 @app.get("/")
 async def root():
 
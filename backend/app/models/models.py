@@ -200,3 +200,42 @@ class EcosystemCompany(Base):
     longitude = Column(Float, nullable=True)
     headquarters = Column(String, nullable=True)
     timestamp = Column(DateTime, default=datetime.datetime.utcnow)
+
+class ScenarioRun(Base):
+    __tablename__ = "scenario_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    cache_key = Column(String(64), unique=True, index=True) # SHA-256 of the engine version and simulation parameters
+    params = Column(JSON) # mu, sigma, exposure, steps, paths, method, seed and sampling options
+    result = Column(JSON) # Engine summary dict
+    timestamp = Column(DateTime, default=datetime.datetime.utcnow, index=True) # Rows past SCENARIO_RUN_TTL are pruned
+
+class ScenarioAtlasEntry(Base):
+    __tablename__ = "scenario_atlas"
+
+    id = Column(Integer, primary_key=True, index=True)
+    topic_id = Column(String, index=True)
+    scenario_type = Column(String) # 'base', 'bull' or 'bear'
+    fingerprint = Column(String(64)) # SHA-256 of the domain fields and AI assumptions the entry was built from
+    results = Column(JSON) # {exposure: ScenarioRunResult dict} for each standard exposure
+    timestamp = Column(DateTime, default=datetime.datetime.utcnow)
+
+class InterrogationCacheEntry(Base):
+    __tablename__ = "interrogation_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    cache_key = Column(String(64), unique=True, index=True) # SHA-256 of topic, normalized query and context hash
+    topic_id = Column(String, index=True)
+    context_hash = Column(String(64)) # SHA-256 of the domain and research context answered against
+    query = Column(Text) # Normalized query
+    response = Column(JSON) # InterrogationResponse dict
+    timestamp = Column(DateTime, default=datetime.datetime.utcnow)
+
+class ScenarioAssumptionEntry(Base):
+    __tablename__ = "scenario_assumptions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    topic_name = Column(String, index=True) # Topic name as sent in the assumptions prompt
+    scenario_type = Column(String) # Normalized scenario type
+    assumptions = Column(JSON) # augment_scenario_assumptions result: assumptions, mu, sigma, horizons
+    timestamp = Column(DateTime, default=datetime.datetime.utcnow)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import Annotated, List, Literal, Optional, Dict, Any
 import datetime
 
 class CitationBase(BaseModel):
@@ -75,17 +75,213 @@ class PortfolioProfileRead(PortfolioProfileBase):
         from_attributes = True
 
 class ScenarioRunResult(BaseModel):
-    scenario_id: int
+    scenario_id: str # Content address of the run in the scenario_runs cache
     impact_bands: List[float]
     risk_deltas: Dict[str, float]
     confidence_intervals: List[float]
     assumptions_explicit: Dict[str, Any]
     augmented_assumptions: Optional[List[str]] = None
+    mean_impact: Optional[float] = None
+    estimator: Optional[str] = None
+    standard_error: Optional[float] = None
+    paths_used: Optional[int] = None
+    converged: Optional[bool] = None
+    horizon: Optional[int] = None
+    fan_chart: Optional[Dict[str, Any]] = None # {"years", "percentiles", "values": [year][percentile], "mean"}
+    cache_hit: bool = False
+    atlas_hit: bool = False # Served from the precomputed scenario atlas
+    distribution: Optional[Dict[str, Any]] = None # Base64 histogram counts / ECDF quantiles
+    first_passage: Optional[Dict[str, Any]] = None # Per-threshold hit probabilities and hitting times
+    tail_risk: Optional[Dict[str, Any]] = None # {"levels", "value_at_risk", "expected_shortfall"}, losses positive
+    drawdown: Optional[Dict[str, Any]] = None # Per-path maximum drawdown percentiles
+    sensitivities: Optional[Dict[str, Dict[str, float]]] = None # d mean_impact / d {mu, sigma, exposure} with standard errors
+    model: Optional[str] = None
 
 class ScenarioRequest(BaseModel):
     topic_id: str
     scenario_type: str
     portfolio_data: PortfolioProfileBase
+    method: Literal["monte_carlo", "analytic"] = "monte_carlo" # 'analytic' is exact, no sampling
+    paths: Optional[int] = Field(None, ge=100, le=10_000_000)
+    variance_reduction: str = "none" # 'none', 'antithetic', 'control_variate' or 'sobol'
+    seed: Optional[int] = None
+    tolerance: Optional[float] = Field(None, gt=0) # Enables adaptive path counts when set
+    max_paths: Optional[int] = Field(None, ge=100, le=10_000_000)
+    chunk_size: Optional[int] = Field(None, ge=1000) # Enables bounded-memory streaming when set
+    float32: bool = False
+    horizon: Optional[int] = Field(None, ge=1, le=50) # Years; defaults to the AI-suggested horizon
+    fan_chart: bool = False
+    histogram_bins: Optional[int] = Field(None, ge=2, le=1024)
+    cdf_points: Optional[int] = Field(None, ge=2, le=1024)
+    thresholds: Optional[List[float]] = Field(None, max_length=64) # Impact levels for first-passage stats
+    risk_levels: Optional[List[Annotated[float, Field(gt=0, lt=1)]]] = Field(None, min_length=1, max_length=8) # VaR / CVaR confidence levels, e.g. 0.95
+    drawdown: bool = False
+    model: str = "gbm" # 'gbm', 'jump_diffusion' or 'regime_switching'
+    model_params: Optional[Dict[str, float]] = None # Overrides for the model's defaults, e.g. jump_intensity
+    use_cache: bool = True
+
+class ScenarioSweepRequest(BaseModel):
+    mus: List[float] = Field(..., min_length=1, max_length=100)
+    sigmas: List[Annotated[float, Field(ge=0)]] = Field(..., min_length=1, max_length=100)
+    exposures: List[float] = Field(..., min_length=1, max_length=100)
+    percentiles: Optional[List[float]] = Field(None, max_length=16)
+    paths: Optional[int] = Field(None, ge=100, le=10_000_000)
+    seed: Optional[int] = None
+
+class ScenarioSweepResult(BaseModel):
+    mus: List[float]
+    sigmas: List[float]
+    exposures: List[float]
+    percentiles: List[float]
+    values: List[List[List[List[float]]]] # [mu][sigma][exposure][percentile]
+    mean_impact: List[List[List[float]]] # [mu][sigma][exposure]
+    std_impact: List[List[List[float]]]
+    paths_used: int
+
+class DomainAssumption(BaseModel):
+    mu: float
+    sigma: float = Field(..., ge=0)
+
+class PortfolioScenarioRequest(BaseModel):
+    scenario_type: str
+    portfolio_data: PortfolioProfileBase # asset_allocation keys are domain topic_ids or names
+    domain_assumptions: Dict[str, DomainAssumption] = {} # Overrides the AI assumptions per domain
+    correlation: Optional[List[List[float]]] = None # Ordered as asset_allocation
+    default_correlation: float = Field(0.3, ge=-0.05, le=0.99)
+    paths: int = Field(100_000, ge=100, le=2_000_000)
+    seed: Optional[int] = None
+    horizon: Optional[int] = Field(None, ge=1, le=50) # Years; defaults to the longest AI-suggested horizon
+
+class DomainContribution(BaseModel):
+    domain: str
+    weight: float
+    mu: float
+    sigma: float
+    impact_bands: List[float]
+    confidence_intervals: List[float]
+    mean_contribution: float
+    tail_contribution: float
+
+class PortfolioScenarioResult(BaseModel):
+    impact_bands: List[float]
+    confidence_intervals: List[float]
+    mean_impact: float
+    standard_error: float
+    risk_deltas: Dict[str, float]
+    paths_used: int
+    horizon: int
+    domains: List[DomainContribution]
+
+class ScenarioComparisonRequest(BaseModel):
+    topic_id: str
+    scenario_types: List[str] = Field(..., min_length=2, max_length=8) # First entry is the baseline for deltas
+    portfolio_data: PortfolioProfileBase
+    paths: Optional[int] = Field(None, ge=100, le=5_000_000)
+    variance_reduction: str = "none"
+    seed: Optional[int] = None
+    horizon: Optional[int] = Field(None, ge=1, le=50) # Years for every scenario; defaults to each one's AI-suggested horizon
+
+class ScenarioComparisonEntry(BaseModel):
+    scenario_type: str
+    mu: float
+    sigma: float
+    horizon: int
+    impact_bands: List[float]
+    confidence_intervals: List[float]
+    mean_impact: float
+    standard_error: float
+    augmented_assumptions: Optional[List[str]] = None
+
+class ScenarioDelta(BaseModel):
+    scenario_type: str
+    baseline: str
+    impact_bands: List[float]
+    confidence_intervals: List[float]
+    mean_delta: float
+    standard_error: float
+    independent_standard_error: float
+
+class ScenarioComparisonResult(BaseModel):
+    topic_id: str
+    exposure: float
+    paths_used: int
+    scenarios: List[ScenarioComparisonEntry]
+    deltas: List[ScenarioDelta]
+
+class PortfolioBatchRequest(BaseModel):
+    topic_id: str
+    scenario_type: str
+    portfolios: List[PortfolioProfileBase] = Field(..., min_length=1, max_length=5000)
+    allocation_key: str = "DeepTech" # asset_allocation entry used as each portfolio's exposure
+    paths: Optional[int] = Field(None, ge=100, le=5_000_000)
+    variance_reduction: str = "none"
+    seed: Optional[int] = None
+    horizon: Optional[int] = Field(None, ge=1, le=50) # Years; defaults to the AI-suggested horizon
+
+class PortfolioBatchEntry(BaseModel):
+    index: int
+    exposure: float
+    impact_bands: List[float]
+    confidence_intervals: List[float]
+    mean_impact: float
+    standard_error: float
+    risk_deltas: Dict[str, float]
+
+class PortfolioBatchResult(BaseModel):
+    topic_id: str
+    scenario_type: str
+    assumptions_explicit: Dict[str, Any]
+    paths_used: int
+    horizon: int
+    results: List[PortfolioBatchEntry]
+
+class TRLProgressionEntry(BaseModel):
+    topic_id: str
+    name: str
+    trl: int
+    years_to_scale: int
+    advance_probability: float
+    probability_trl9_by_year: List[float]
+    median_years_to_trl9: Optional[int] = None
+
+class TRLProgressionResult(BaseModel):
+    horizon: int
+    paths: int
+    domains: List[TRLProgressionEntry]
+    cache_hit: bool = False
+
+class RealOptionsRequest(BaseModel):
+    scenario_type: str = "base"
+    topic_ids: Optional[List[str]] = None # Defaults to every domain
+    investment_cost: float = Field(1.0, gt=0) # Relative to today's project value
+    risk_free_rate: Optional[float] = Field(None, ge=-0.05, le=0.5)
+    hurdle_rate: Optional[float] = Field(None, ge=0, le=1) # Required return; sets the cost of waiting
+    steps: Optional[int] = Field(None, ge=10, le=2000)
+    american: bool = True
+
+class RealOptionValuation(BaseModel):
+    topic_id: str
+    name: str
+    trl: int
+    years_to_scale: int
+    mu: float
+    sigma: float
+    failure_hazard: float
+    opportunity_cost: float # Dividend-like yield forgone while waiting, max(hurdle_rate - mu, 0)
+    option_value: float
+    european_value: float
+    flexibility_value: float
+    invest_now: bool
+    exercise_boundary: List[Optional[float]] # Project value that triggers investment, by year
+
+class RealOptionsResult(BaseModel):
+    scenario_type: str
+    steps: int
+    risk_free_rate: float
+    hurdle_rate: float
+    investment_cost: float
+    static_npv: float
+    valuations: List[RealOptionValuation]
 
 class InterrogationRequest(BaseModel):
     user_id: str
@@ -98,6 +294,19 @@ class InterrogationResponse(BaseModel):
     avoid_rationale: Optional[str] = None
     confidence_score: float
     sources: List[CitationBase] = []
+    cached: bool = False # Served from the interrogation cache
+    similarity: Optional[float] = None # Query similarity when served by the semantic cache
+
+class InterrogationCacheStats(BaseModel):
+    threshold: float # Cosine similarity needed for a semantic hit
+    lookups: int
+    hits: int
+    hit_rate: float
+    mean_hit_similarity: Optional[float] = None
+    topics: int # Topics with a loaded vector index
+    queries: int # Queries held across those indexes
+    exact_hits: int # In-memory exact-match hits since startup
+    exact_misses: int
 
 class BriefAuditBase(BaseModel):
     topic_id: str
@@ -0,0 +1,231 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+import datetime
+from statistics import NormalDist
+
+import numpy as np
+
+# Add the backend directory to sys.path so 'app' resolves from any working directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.core.simulation import MonteCarloEngine, STREAMING_CHUNK_SIZE, BAND_PERCENTILES, FULL_PATH_MAX_ELEMENTS
+
+# Scenario parameters shared by every case
+BASE_VALUE = 1.0
+MU = 0.08
+SIGMA = 0.35
+EXPOSURE = 1.0
+STEPS = 5
+
+DEFAULT_PATHS = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+MODELS = ["gbm", "jump_diffusion", "regime_switching"]
+
+MODES = {
+    "plain": {},
+    "antithetic": {"variance_reduction": "antithetic"},
+    "control_variate": {"variance_reduction": "control_variate"},
+    "sobol": {"variance_reduction": "sobol"},
+    "streaming": {"chunk_size": STREAMING_CHUNK_SIZE},
+    "streaming_float32": {"chunk_size": STREAMING_CHUNK_SIZE, "float32": True},
+    "full_paths": {"fan_chart": True},
+    "analytic": {"method": "analytic"}
+}
+
+# A mean more than this many standard errors from the exact value fails the accuracy check
+MAX_MEAN_Z = 4.0
+# Likewise for an impact band against the analytic GBM percentile, in quantile standard errors
+MAX_BAND_Z = 4.0
+# Normalized rank error allowed on top of sampling error for the streaming quantile sketch
+# (KLL with the engine's default k=2048, merged across executor chunks)
+SKETCH_RANK_ERROR = 2 / 2048
+
+def exact_gbm(engine: MonteCarloEngine) -> dict:
+    return engine.run_simulation(BASE_VALUE, MU, SIGMA, EXPOSURE, paths=1_000_000, method="analytic")
+
+def skip_reason(engine: MonteCarloEngine, mode: str, paths: int) -> str:
+    if mode == "analytic" and not engine.model.closed_form:
+        return "no closed form"
+    if mode == "full_paths" and paths * STEPS > FULL_PATH_MAX_ELEMENTS:
+        return f"full paths above {FULL_PATH_MAX_ELEMENTS} elements"
+    return ""
+
+def band_densities(exact: dict) -> list:
+    """
+    Analytic GBM impact density at each exact band percentile.
+    """
+    log_mean = (MU - 0.5 * SIGMA**2) * STEPS
+    log_std = SIGMA * np.sqrt(STEPS)
+    densities = []
+    for q in exact["impact_bands"]:
+        value = BASE_VALUE + q / EXPOSURE
+        densities.append(NormalDist(log_mean, log_std).pdf(np.log(value / BASE_VALUE)) / (value * abs(EXPOSURE)))
+    return densities
+
+def check_accuracy(engine: MonteCarloEngine, mode: str, paths: int, summary: dict, exact: dict) -> dict:
+    """
+    Mean against the model's exact expectation (in standard errors), and for GBM the
+    impact bands against the analytic percentiles (in quantile standard errors, widened by
+    the sketch's rank error in streaming modes). Both must pass for ok.
+    """
+    expected_mean = (BASE_VALUE * engine.model.expected_growth(MU, STEPS) - 1.0) * EXPOSURE
+    se = summary["standard_error"]
+    error = summary["mean_impact"] - expected_mean
+    if se > 0:
+        mean_z = abs(error) / se
+    else:
+        # Only the analytic mode reports no sampling error; it must then be exact up to rounding
+        mean_z = 0.0 if abs(error) <= 1e-9 * max(1.0, abs(expected_mean)) else float("inf")
+
+    accuracy = {"mean_error": error, "mean_z": mean_z, "ok": mean_z <= MAX_MEAN_Z}
+    if engine.model.name == "gbm":
+        band_errors = [abs(a - b) for a, b in zip(summary["impact_bands"], exact["impact_bands"])]
+        # Quantile standard error sqrt(p(1 - p) / n) / f(q), plus the sketch's rank error over f(q)
+        rank_error = SKETCH_RANK_ERROR if "chunk_size" in MODES[mode] else 0.0
+        tolerances = [
+            (np.sqrt(p / 100 * (1 - p / 100) / paths) + rank_error) / density
+            for p, density in zip(BAND_PERCENTILES, band_densities(exact))
+        ]
+        band_z = float(max(e / t for e, t in zip(band_errors, tolerances)))
+        accuracy.update({"max_band_error": float(max(band_errors)), "max_band_z": band_z})
+        accuracy["ok"] = accuracy["ok"] and band_z <= MAX_BAND_Z
+    return accuracy
+
+def measure(engine: MonteCarloEngine, kwargs: dict, repeat: int) -> dict:
+    """
+    Best wall time over repeat runs, then one more run under tracemalloc for peak memory
+    (NumPy reports its buffers to tracemalloc).
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        summary = engine.run_simulation(BASE_VALUE, MU, SIGMA, EXPOSURE, **kwargs)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    engine.run_simulation(BASE_VALUE, MU, SIGMA, EXPOSURE, **kwargs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"summary": summary, "seconds": min(timings), "peak_mb": peak / 2**20}
+
+def run_benchmarks(paths_list, modes, models, repeat: int, seed: int) -> dict:
+    base_engine = MonteCarloEngine(steps=STEPS, seed=seed)
+    exact = exact_gbm(base_engine)
+    results = []
+
+    for model in models:
+        engine = base_engine.with_model(model)
+        for mode in modes:
+            for paths in paths_list:
+                case = {"model": model, "mode": mode, "paths": paths}
+                reason = skip_reason(engine, mode, paths)
+                if reason:
+                    print(f"  skip {model:<17} {mode:<18} {paths:>10,}  ({reason})")
+                    continue
+
+                # Fewer repeats where a single run already takes seconds
+                measured = measure(engine, {**MODES[mode], "paths": paths}, repeat if paths < 1_000_000 else 1)
+                accuracy = check_accuracy(engine, mode, paths, measured["summary"], exact)
+                case.update({
+                    "seconds": measured["seconds"],
+                    "paths_per_sec": paths / measured["seconds"],
+                    "peak_mb": measured["peak_mb"],
+                    "accuracy": accuracy
+                })
+                results.append(case)
+                flag = "" if accuracy["ok"] else "  INACCURATE"
+                band = f"  band z={accuracy['max_band_z']:.2f}" if "max_band_z" in accuracy else ""
+                print(
+                    f"  {model:<17} {mode:<18} {paths:>10,}  {measured['seconds'] * 1000:9.1f} ms  "
+                    f"{case['paths_per_sec']:14,.0f} paths/s  {measured['peak_mb']:8.1f} MB  z={accuracy['mean_z']:.2f}{band}{flag}"
+                )
+
+    return {
+        "created": datetime.datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "steps": STEPS,
+        "seed": seed,
+        "results": results
+    }
+
+def compare(baseline: dict, current: dict, time_threshold: float, memory_threshold: float) -> int:
+    """
+    Prints per-case time and memory ratios and returns the number of regressions: slower
+    or larger than the thresholds allow, or newly failing the accuracy check.
+    """
+    def index(report):
+        return {(r["model"], r["mode"], r["paths"]): r for r in report["results"]}
+
+    before, after = index(baseline), index(current)
+    regressions = 0
+    for key in sorted(set(before) & set(after), key=lambda k: (k[0], k[1], k[2])):
+        old, new = before[key], after[key]
+        time_ratio = new["seconds"] / old["seconds"] if old["seconds"] > 0 else 1.0
+        memory_ratio = new["peak_mb"] / old["peak_mb"] if old["peak_mb"] > 0 else 1.0
+
+        problems = []
+        if time_ratio > 1 + time_threshold:
+            problems.append("slower")
+        if memory_ratio > 1 + memory_threshold:
+            problems.append("more memory")
+        if old["accuracy"]["ok"] and not new["accuracy"]["ok"]:
+            problems.append("accuracy")
+        regressions += bool(problems)
+
+        model, mode, paths = key
+        status = f"REGRESSION ({', '.join(problems)})" if problems else "ok"
+        print(f"  {model:<17} {mode:<18} {paths:>10,}  time x{time_ratio:5.2f}  memory x{memory_ratio:5.2f}  {status}")
+
+    for key in sorted(set(before) - set(after)):
+        print(f"  missing from current run: {key}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks for the scenario simulation engine")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Time the engine and write a JSON report")
+    run.add_argument("--paths", type=int, nargs="+", default=DEFAULT_PATHS)
+    run.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    run.add_argument("--models", nargs="+", choices=MODELS, default=MODELS)
+    run.add_argument("--repeat", type=int, default=3)
+    run.add_argument("--seed", type=int, default=12345)
+    run.add_argument("--quick", action="store_true", help="Only path counts up to 100k")
+    run.add_argument("--output", default="bench_simulation.json")
+
+    diff = commands.add_parser("compare", help="Compare two JSON reports and flag regressions")
+    diff.add_argument("baseline")
+    diff.add_argument("current")
+    diff.add_argument("--time-threshold", type=float, default=0.15, help="Allowed slowdown, e.g. 0.15 for 15%%")
+    diff.add_argument("--memory-threshold", type=float, default=0.10)
+
+    args = parser.parse_args()
+
+    if args.command == "run":
+        paths_list = [p for p in args.paths if p <= 100_000] if args.quick else args.paths
+        print(f"Benchmarking {len(args.models)} models x {len(args.modes)} modes x {len(paths_list)} path counts...")
+        report = run_benchmarks(paths_list, args.modes, args.models, args.repeat, args.seed)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        failures = sum(not r["accuracy"]["ok"] for r in report["results"])
+        print(f"Wrote {len(report['results'])} results to {args.output} ({failures} accuracy failures).")
+        sys.exit(1 if failures else 0)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    regressions = compare(baseline, current, args.time_threshold, args.memory_threshold)
+    print(f"{regressions} regressions found.")
+    sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+import asyncio
+import pytest
+from app.core.executor import SimulationExecutor, MIN_PATHS_PER_CHUNK
+from app.core.simulation import MonteCarloEngine
+
+PARAMS = {"base_value": 1.0, "mu": 0.08, "sigma": 0.35, "portfolio_exposure": 0.2, "seed": 42}
+
+def run(executor: SimulationExecutor, **kwargs) -> dict:
+    try:
+        return asyncio.run(executor.run_simulation(**PARAMS, **kwargs))
+    finally:
+        executor.shutdown()
+
+@pytest.mark.parametrize("options", [
+    {"variance_reduction": "none"},
+    {"variance_reduction": "antithetic"},
+    {"chunk_size": 100_000}
+])
+def test_seeded_chunked_runs_do_not_depend_on_pool_size(options):
+    paths = 3 * MIN_PATHS_PER_CHUNK
+    engine = MonteCarloEngine()
+    single = run(SimulationExecutor(engine, max_workers=0), paths=paths, **options)
+    pooled = run(SimulationExecutor(engine, max_workers=2), paths=paths, **options)
+
+    for field in ("impact_bands", "confidence_intervals", "mean_impact", "standard_error", "sensitivities"):
+        assert single[field] == pooled[field]
+    assert single["paths_used"] == pooled["paths_used"] == paths
@@ -0,0 +1,33 @@
+import pytest
+from app.core.semantic_cache import SemanticQueryIndex
+
+def lookup(cached_query: str, query: str):
+    index = SemanticQueryIndex()
+    index.add("ai-infrastructure", "context", cached_query, {"answer": cached_query})
+    return index.lookup("ai-infrastructure", "context", query)
+
+@pytest.mark.parametrize("cached_query, query", [
+    ("how does power constrain AI scaling", "is grid capacity a bottleneck for AI"),
+    ("What is the cost of solid state batteries?", "how expensive are solid-state batteries"),
+    ("How does power constrain AI scaling?", "how does power constrain ai scaling")
+])
+def test_paraphrases_hit(cached_query, query):
+    match = lookup(cached_query, query)
+    assert match is not None
+    response, similarity, _, _ = match
+    assert response == {"answer": cached_query}
+    assert similarity >= SemanticQueryIndex().threshold
+
+@pytest.mark.parametrize("cached_query, query", [
+    ("Does AI scaling constrain power?", "Does power constrain AI scaling?"),
+    ("Will China overtake the US in quantum computing?", "Will the US overtake China in quantum computing?"),
+    ("Is China ahead of the US?", "Is the US ahead of China?")
+])
+def test_swapped_subject_and_object_miss(cached_query, query):
+    assert lookup(cached_query, query) is None
+
+def test_negation_misses():
+    assert lookup("is power a constraint on AI scaling", "isn't power a constraint on AI scaling") is None
+
+def test_unrelated_question_misses():
+    assert lookup("Does power constrain AI scaling?", "what is the timeline for fusion commercialisation") is None